@@ -1,32 +1,44 @@
 """
 Bivariate Analysis Script
 
-This script demonstrates bivariate analysis using pandas and seaborn to analyze
+This script demonstrates bivariate analysis using NumPy and matplotlib to analyze
 the relationship between study hours and exam scores.
 """
 
+import argparse
+
 import numpy as np
-import pandas as pd
-import seaborn as sns
 import matplotlib.pyplot as plt
 
-def main():
+from plot_aggregation import LARGE_DATA_THRESHOLD, density_grid, plot_density
+from regression_summary import RegressionStats, bootstrap_bands, plot_fit
+
+def main(n_points=100):
     # Set random seed for reproducibility
     np.random.seed(42)
     
     # Generate sample data
-    study_hours = np.random.normal(5, 1.5, 100)
-    exam_scores = 30 + 5 * study_hours + np.random.normal(0, 3, 100)
+    study_hours = np.random.normal(5, 1.5, n_points)
+    exam_scores = 30 + 5 * study_hours + np.random.normal(0, 3, n_points)
 
-    # Create DataFrame
-    data = pd.DataFrame({
-        'Study_Hours': study_hours,
-        'Exam_Score': exam_scores
-    })
+    # Fit line, band and correlation from one pass of sufficient statistics
+    summary = RegressionStats.from_arrays(study_hours, exam_scores)
+    x_grid = np.linspace(study_hours.min(), study_hours.max(), 100)
+    fit = summary.predict(x_grid)
 
     # Create visualization
     plt.figure(figsize=(10, 6))
-    sns.regplot(x='Study_Hours', y='Exam_Score', data=data, scatter_kws={'alpha':0.6})
+    ax = plt.gca()
+    if n_points > LARGE_DATA_THRESHOLD:
+        # Too many points to draw one by one: plot their density and the closed-form band
+        plot_density(ax, *density_grid(study_hours, exam_scores))
+        bands = summary.bands(x_grid)
+        plot_fit(ax, x_grid, fit, bands['ci_low'], bands['ci_high'],
+                 color='red', line_kws={'linewidth': 2})
+    else:
+        # Scatter plus the same bootstrap band sns.regplot draws
+        ax.scatter(study_hours, exam_scores, alpha=0.6)
+        plot_fit(ax, x_grid, fit, *bootstrap_bands(study_hours, exam_scores, x_grid))
     plt.title('Study Hours vs Exam Score')
     plt.xlabel('Study Hours')
     plt.ylabel('Exam Score')
@@ -38,8 +50,10 @@ def main():
     plt.close()
     
     # Calculate and print correlation
-    correlation = data['Study_Hours'].corr(data['Exam_Score'])
-    print(f"Correlation coefficient: {correlation:.2f}")
+    print(f"Correlation coefficient: {summary.r:.2f}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Study hours vs exam score")
+    parser.add_argument('--points', type=int, default=100, help="number of students to simulate")
+    args = parser.parse_args()
+    main(args.points)
@@ -4,27 +4,43 @@ Categorical vs Categorical Analysis
 This script generates a stacked bar chart for categorical vs categorical analysis.
 """
 
+import argparse
+
 import numpy as np
-import pandas as pd
-import seaborn as sns
 import matplotlib.pyplot as plt
 
-def main():
+from category_aggregation import CategoryEncoder, ContingencyTable, iter_csv_codes
+
+METHODS = ['Self-Study', 'Group', 'Tutoring']
+RESULTS = ['Pass', 'Fail']
+
+def main(data_path=None):
     # Set random seed for reproducibility
     np.random.seed(42)
     
-    # Sample data: Study Method vs Exam Result (Pass/Fail)
-    data = {
-        'Study_Method': ['Self-Study']*20 + ['Group']*20 + ['Tutoring']*20,
-        'Result': (['Pass']*8 + ['Fail']*12 +  # Self-Study
-                  ['Pass']*15 + ['Fail']*5 +   # Group
-                  ['Pass']*18 + ['Fail']*2)    # Tutoring
-    }
-    
-    df = pd.DataFrame(data)
+    if data_path:
+        # Large result tables: encode the two columns chunk by chunk and count codes
+        encoders = {'Study_Method': CategoryEncoder(METHODS), 'Result': CategoryEncoder(RESULTS)}
+        counts = ContingencyTable(len(METHODS), len(RESULTS))
+        for (method_codes, result_codes), _ in iter_csv_codes(
+                data_path, ['Study_Method', 'Result'], encoders):
+            counts.update(method_codes, result_codes)
+        methods, results = encoders['Study_Method'].categories, encoders['Result'].categories
+    else:
+        # Sample data: Study Method vs Exam Result (Pass/Fail), as integer codes
+        # (0 = Pass, 1 = Fail) instead of one string per student
+        methods, results = METHODS, RESULTS
+        method_codes = np.repeat(np.arange(3, dtype=np.int8), 20)
+        result_codes = np.concatenate([
+            np.repeat(np.int8([0, 1]), [8, 12]),   # Self-Study
+            np.repeat(np.int8([0, 1]), [15, 5]),   # Group
+            np.repeat(np.int8([0, 1]), [18, 2])    # Tutoring
+        ])
+        counts = ContingencyTable(len(METHODS), len(RESULTS)).update(method_codes, result_codes)
     
-    # Create cross-tabulation
-    cross_tab = pd.crosstab(df['Study_Method'], df['Result'])
+    # Create cross-tabulation (sorted like pd.crosstab)
+    cross_tab = counts.to_frame(methods, results, 'Study_Method', 'Result')
+    cross_tab = cross_tab.sort_index().sort_index(axis=1)
     
     # Create visualization
     plt.figure(figsize=(10, 6))
@@ -59,4 +75,8 @@ def main():
     print("Stacked bar chart saved as 'graph/study_method_vs_result.png'")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Exam results by study method")
+    parser.add_argument('--data', default=None,
+                        help="CSV with Study_Method and Result columns (default: built-in sample)")
+    args = parser.parse_args()
+    main(args.data)
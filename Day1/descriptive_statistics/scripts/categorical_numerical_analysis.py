@@ -4,12 +4,19 @@ Categorical vs Numerical Analysis
 This script generates a box plot for categorical vs numerical analysis.
 """
 
+import argparse
+
 import numpy as np
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-def main():
+from category_aggregation import GroupHistogram, GroupStats
+from plot_aggregation import LARGE_DATA_THRESHOLD, data_range, subsample_strip
+
+CATEGORIES = ['Electronics', 'Clothing', 'Furniture']
+
+def main(n_per_category=30):
     # Set random seed for reproducibility
     np.random.seed(42)
     
@@ -17,38 +24,51 @@ def main():
     np.random.seed(42)
     
     # Generate sample data for three product categories
-    data = {
-        'Category': (['Electronics'] * 30 + 
-                    ['Clothing'] * 30 + 
-                    ['Furniture'] * 30),
-        'Sales': (
-            # Electronics: higher variance, higher average
-            list(np.random.normal(1200, 300, 30)) +
-            # Clothing: moderate average, less variance
-            list(np.random.normal(800, 150, 30)) +
-            # Furniture: lower average, some high-value sales
-            list(np.random.normal(500, 200, 25)) + list(np.random.normal(1500, 100, 5))
-        )
-    }
-    
-    df = pd.DataFrame(data)
+    n = n_per_category
+    sales = np.concatenate([
+        # Electronics: higher variance, higher average
+        np.random.normal(1200, 300, n),
+        # Clothing: moderate average, less variance
+        np.random.normal(800, 150, n),
+        # Furniture: lower average, some high-value sales
+        np.random.normal(500, 200, n - n // 6), np.random.normal(1500, 100, n // 6)
+    ])
     
     # Create visualization
     plt.figure(figsize=(12, 6))
     
-    # Create boxplot
-    ax = sns.boxplot(x='Category', y='Sales', data=df, 
-                    order=['Electronics', 'Clothing', 'Furniture'],
-                    palette='viridis')
+    # Integer category codes instead of one string per sale
+    codes = np.repeat(np.arange(len(CATEGORIES), dtype=np.int8), n)
+    means = pd.Series(GroupStats().update(codes, sales).mean, index=CATEGORIES)
     
-    # Add stripplot to show individual data points
-    sns.stripplot(x='Category', y='Sales', data=df, 
-                 order=['Electronics', 'Clothing', 'Furniture'],
-                 color='black', alpha=0.5, size=5, jitter=True)
+    if 3 * n > LARGE_DATA_THRESHOLD:
+        # Box plot from per-category histogram quartiles
+        histogram = GroupHistogram(*data_range(sales), len(CATEGORIES)).update(codes, sales)
+        ax = plt.gca()
+        boxes = ax.bxp(histogram.box_stats(CATEGORIES), positions=range(len(CATEGORIES)),
+                       showfliers=False, patch_artist=True, widths=0.8)
+        for patch, color in zip(boxes['boxes'], sns.color_palette('viridis', len(CATEGORIES))):
+            patch.set_facecolor(color)
+        
+        # Strip of a fixed-size random sample per category
+        strip_codes, strip_sales = subsample_strip(codes, sales, per_category=200)
+        jitter = np.random.default_rng(42).uniform(-0.2, 0.2, len(strip_codes))
+        ax.scatter(strip_codes + jitter, strip_sales, color='black', alpha=0.5, s=5)
+    else:
+        df = pd.DataFrame({'Category': np.repeat(CATEGORIES, n), 'Sales': sales})
+        
+        # Create boxplot
+        ax = sns.boxplot(x='Category', y='Sales', data=df, 
+                        order=CATEGORIES,
+                        palette='viridis')
+        
+        # Add stripplot to show individual data points
+        sns.stripplot(x='Category', y='Sales', data=df, 
+                     order=CATEGORIES,
+                     color='black', alpha=0.5, size=5, jitter=True)
     
     # Add mean line
-    means = df.groupby('Category')['Sales'].mean()
-    for i, category in enumerate(['Electronics', 'Clothing', 'Furniture']):
+    for i, category in enumerate(CATEGORIES):
         plt.hlines(means[category], i-0.4, i+0.4, colors='red', linestyles='dashed', linewidth=2)
     
     # Customize the plot
@@ -60,7 +80,7 @@ def main():
     plt.grid(axis='y', linestyle='--', alpha=0.7)
     
     # Add mean values as text
-    for i, category in enumerate(['Electronics', 'Clothing', 'Furniture']):
+    for i, category in enumerate(CATEGORIES):
         plt.text(i, means[category] + 50, f'Mean: ${means[category]:.0f}',
                 ha='center', va='bottom', fontweight='bold', color='red')
     
@@ -72,4 +92,8 @@ def main():
     print("Box plot saved as 'graph/category_vs_sales.png'")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Sales distribution by product category")
+    parser.add_argument('--per-category', type=int, default=30,
+                        help="sales to simulate per category")
+    args = parser.parse_args()
+    main(args.per_category)
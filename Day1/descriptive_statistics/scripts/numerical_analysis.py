@@ -4,13 +4,16 @@ Numerical vs Numerical Analysis
 This script generates a scatter plot with regression line for numerical vs numerical analysis.
 """
 
+import argparse
+
 import numpy as np
 import pandas as pd
-import seaborn as sns
 import matplotlib.pyplot as plt
-from scipy import stats
 
-def main():
+from plot_aggregation import LARGE_DATA_THRESHOLD, density_grid, plot_density
+from regression_summary import RegressionStats, bootstrap_bands, plot_fit
+
+def main(n_points=100):
     # Set random seed for reproducibility
     np.random.seed(42)
     
@@ -18,10 +21,10 @@ def main():
     np.random.seed(42)
     
     # Generate base values
-    years_exp = np.random.uniform(0, 20, 100)
+    years_exp = np.random.uniform(0, 20, n_points)
     
     # Create salary with positive correlation to experience
-    salary = 40000 + (years_exp * 2500) + np.random.normal(0, 10000, 100)
+    salary = 40000 + (years_exp * 2500) + np.random.normal(0, 10000, n_points)
     
     # Ensure no negative salaries
     salary = np.maximum(salary, 30000)
@@ -32,16 +35,30 @@ def main():
         'Salary': np.round(salary, -2)  # Round to nearest $100
     })
     
+    # Fit line, band and correlation from one pass of sufficient statistics
+    x = data['Years_Experience'].to_numpy()
+    y = data['Salary'].to_numpy()
+    summary = RegressionStats.from_arrays(x, y)
+    x_grid = np.linspace(x.min(), x.max(), 100)
+    fit = summary.predict(x_grid)
+    
     # Create visualization
     plt.figure(figsize=(12, 7))
+    ax = plt.gca()
     
-    # Create scatter plot with regression line
-    ax = sns.regplot(x='Years_Experience', y='Salary', data=data, 
-                    scatter_kws={'alpha':0.6, 's':80},
-                    line_kws={'color':'red', 'linewidth':2.5})
+    if n_points > LARGE_DATA_THRESHOLD:
+        # Density grid plus closed-form band instead of one marker per point
+        plot_density(ax, *density_grid(x, y))
+        bands = summary.bands(x_grid)
+        ci_low, ci_high = bands['ci_low'], bands['ci_high']
+    else:
+        # Create scatter plot with the bootstrap band sns.regplot draws
+        ax.scatter(x, y, alpha=0.6, s=80)
+        ci_low, ci_high = bootstrap_bands(x, y, x_grid)
+    plot_fit(ax, x_grid, fit, ci_low, ci_high, color='red', line_kws={'linewidth': 2.5})
     
     # Calculate correlation
-    corr_coef = np.corrcoef(data['Years_Experience'], data['Salary'])[0, 1]
+    corr_coef = summary.r
     
     # Customize the plot
     plt.title('Years of Experience vs Salary', fontsize=16, pad=20, fontweight='bold')
@@ -74,4 +91,7 @@ def main():
     print(f"Correlation coefficient: {corr_coef:.3f}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Years of experience vs salary")
+    parser.add_argument('--points', type=int, default=100, help="number of employees to simulate")
+    args = parser.parse_args()
+    main(args.points)
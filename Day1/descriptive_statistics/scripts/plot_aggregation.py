@@ -0,0 +1,121 @@
+"""
+Large-Data Plot Aggregation
+
+This module pre-aggregates millions of points in NumPy before anything
+reaches matplotlib, so the descriptive-statistics charts render in the same
+time whether they summarise a thousand points or a hundred million:
+
+- density_grid: 2-D histogram (hexbin-style density) built with bincount
+  over chunks, instead of one scatter marker per point
+- subsample_strip: a fixed-size random sample per category for strip plots
+
+Box plots use category_aggregation.GroupHistogram.box_stats, so every chart
+computes quartiles and whiskers the same way.
+"""
+
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+
+# Above this many points the scripts switch to aggregated rendering
+LARGE_DATA_THRESHOLD = 50_000
+
+
+def data_range(values, pad=0.0):
+    """(min, max) of an array, optionally padded by a fraction of the span."""
+    low, high = float(np.min(values)), float(np.max(values))
+    span = (high - low) or 1.0
+    return low - pad * span, high + pad * span
+
+
+def density_grid(x, y, bins=200, x_range=None, y_range=None, chunksize=5_000_000):
+    """Count points per cell of a bins x bins grid.
+
+    Returns (counts, x_edges, y_edges) with counts shaped (y_bins, x_bins),
+    ready for imshow/pcolormesh. Points outside the ranges are dropped.
+    """
+    x_bins, y_bins = (bins, bins) if np.isscalar(bins) else bins
+    x_range = x_range or data_range(x)
+    y_range = y_range or data_range(y)
+    x_scale = x_bins / (x_range[1] - x_range[0])
+    y_scale = y_bins / (y_range[1] - y_range[0])
+    counts = np.zeros(x_bins * y_bins, dtype=np.int64)
+    for start in range(0, len(x), chunksize):
+        xs = np.asarray(x[start:start + chunksize], dtype=np.float64)
+        ys = np.asarray(y[start:start + chunksize], dtype=np.float64)
+        ix = ((xs - x_range[0]) * x_scale).astype(np.int64)
+        iy = ((ys - y_range[0]) * y_scale).astype(np.int64)
+        # Points exactly on the upper edge belong to the last cell
+        ix[xs == x_range[1]] = x_bins - 1
+        iy[ys == y_range[1]] = y_bins - 1
+        inside = (ix >= 0) & (ix < x_bins) & (iy >= 0) & (iy < y_bins)
+        counts += np.bincount(iy[inside] * x_bins + ix[inside], minlength=x_bins * y_bins)
+    x_edges = np.linspace(x_range[0], x_range[1], x_bins + 1)
+    y_edges = np.linspace(y_range[0], y_range[1], y_bins + 1)
+    return counts.reshape(y_bins, x_bins), x_edges, y_edges
+
+
+def plot_density(ax, counts, x_edges, y_edges, cmap='viridis', colorbar=True):
+    """Draw a density grid; empty cells stay blank and counts use a log scale."""
+    masked = np.ma.masked_equal(counts, 0)
+    mesh = ax.pcolormesh(x_edges, y_edges, masked, cmap=cmap,
+                         norm=LogNorm(vmin=1, vmax=max(int(counts.max()), 1)))
+    if colorbar:
+        plt.colorbar(mesh, ax=ax, label='Points per cell')
+    return mesh
+
+
+def subsample_strip(codes, values, per_category=200, seed=42):
+    """Uniform random sample of at most ``per_category`` points per category.
+
+    ``codes`` are integer category codes. Every point gets a random key and
+    the smallest keys in each category are kept, so the sample is unbiased
+    and the whole selection is a couple of array sorts.
+    """
+    codes = np.asarray(codes)
+    rng = np.random.default_rng(seed)
+    keys = rng.random(len(codes))
+    order = np.lexsort((keys, codes))
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    rank = np.arange(len(codes)) - np.repeat(starts, np.diff(np.r_[starts, len(codes)]))
+    keep = order[rank < per_category]
+    return codes[keep], np.asarray(values)[keep]
+
+
+def benchmark(sizes=(10**3, 10**4, 10**5, 10**6, 10**7), scatter_limit=10**6):
+    """Aggregation and render time, plus peak Python memory while rendering."""
+    rng = np.random.default_rng(42)
+    print(f"{'Points':>12} {'Mode':<9} {'Aggregate s':>12} {'Render s':>9} {'Render MB':>10}")
+    print("-" * 57)
+    for n in sizes:
+        x = rng.normal(5, 1.5, n)
+        y = 30 + 5 * x + rng.normal(0, 3, n)
+        modes = ['density'] + (['scatter'] if n <= scatter_limit else [])
+        for mode in modes:
+            t0 = time.perf_counter()
+            if mode == 'density':
+                grid = density_grid(x, y)
+            aggregate = time.perf_counter() - t0
+
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            fig, ax = plt.subplots(figsize=(10, 6))
+            if mode == 'density':
+                plot_density(ax, *grid)
+            else:
+                ax.scatter(x, y, alpha=0.6, s=4)
+            fig.savefig(os.devnull, format='png')
+            plt.close(fig)
+            render = time.perf_counter() - t0
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{n:>12,} {mode:<9} {aggregate:12.3f} {render:9.3f} {peak / 2**20:10.1f}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -4,33 +4,54 @@ Study Method Analysis Script
 This script generates a box plot comparing exam scores across different study methods.
 """
 
+import argparse
+
 import numpy as np
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-def main():
+from category_aggregation import CategoryEncoder, GroupHistogram, GroupStats, iter_csv_codes
+
+METHODS = ['Self-Study', 'Group', 'Tutoring']
+
+def main(data_path=None):
     # Set random seed for reproducibility
     np.random.seed(42)
     
-    # Generate sample data matching the table in the markdown
-    data = {
-        'Student_ID': range(1, 11),
-        'Study_Method': ['Self-Study', 'Group', 'Tutoring', 'Self-Study', 'Group', 
-                        'Tutoring', 'Self-Study', 'Group', 'Tutoring', 'Self-Study'],
-        'Score': [72, 88, 95, 68, 82, 91, 75, 85, 89, 70]
-    }
-    df = pd.DataFrame(data)
-
+    encoder = CategoryEncoder(METHODS)
+    stats = GroupStats(len(METHODS))
+    
     # Create visualization
     plt.figure(figsize=(10, 6))
-    sns.boxplot(x='Study_Method', y='Score', data=df, 
-                order=['Self-Study', 'Group', 'Tutoring'])
     
-    # Add mean line
-    means = df.groupby('Study_Method')['Score'].mean()
-    for i, method in enumerate(['Self-Study', 'Group', 'Tutoring']):
-        plt.hlines(means[method], i-0.4, i+0.4, colors='red', linestyles='dashed', linewidth=2)
+    if data_path:
+        # Large score tables: per-method histograms and moments, one chunk at a time
+        histogram = GroupHistogram(0, 100, len(METHODS))
+        for (codes,), scores in iter_csv_codes(data_path, ['Study_Method'],
+                                               {'Study_Method': encoder}, 'Score'):
+            stats.update(codes, scores)
+            histogram.update(codes, scores)
+        plt.gca().bxp(histogram.box_stats(METHODS), positions=range(len(METHODS)),
+                      showfliers=False, widths=0.8)
+    else:
+        # Generate sample data matching the table in the markdown
+        data = {
+            'Student_ID': range(1, 11),
+            'Study_Method': ['Self-Study', 'Group', 'Tutoring', 'Self-Study', 'Group', 
+                            'Tutoring', 'Self-Study', 'Group', 'Tutoring', 'Self-Study'],
+            'Score': [72, 88, 95, 68, 82, 91, 75, 85, 89, 70]
+        }
+        df = pd.DataFrame(data)
+        stats.update(encoder.encode(df['Study_Method']), df['Score'])
+        sns.boxplot(x='Study_Method', y='Score', data=df, 
+                    order=METHODS)
+    
+    # Add mean line (methods missing from the data have none)
+    for i, method in enumerate(METHODS):
+        if stats.count[i] == 0:
+            continue
+        plt.hlines(stats.mean[i], i-0.4, i+0.4, colors='red', linestyles='dashed', linewidth=2)
     
     plt.title('Exam Performance by Study Method', pad=20)
     plt.xlabel('Study Method')
@@ -43,4 +64,8 @@ def main():
     print("Box plot saved as 'graph/study_method_vs_scores.png'")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Exam scores by study method")
+    parser.add_argument('--data', default=None,
+                        help="CSV with Study_Method and Score columns (default: built-in sample)")
+    args = parser.parse_args()
+    main(args.data)
@@ -1,13 +1,13 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.stats import norm
+import normal_kernels
 
 # Mean and standard deviation
 mu = 70
 sigma = 10
 
 x = np.linspace(mu - 4*sigma, mu + 4*sigma, 1000)
-y = norm.pdf(x, mu, sigma)
+y = normal_kernels.pdf(x, mu, sigma)
 
 plt.plot(x, y, label='Normal Distribution')
 plt.axvline(mu, color='red', linestyle='--', label='Mean')
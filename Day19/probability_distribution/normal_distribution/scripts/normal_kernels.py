@@ -0,0 +1,123 @@
+"""
+Normal Distribution Kernels
+---------------------------
+Array versions of the normal pdf / cdf / logpdf / ppf for the Day19
+scripts. They take whole ndarrays, the constants are precomputed once, and:
+
+  * dtype=np.float32 halves the output memory
+  * out=... writes into an existing buffer, so hot loops allocate nothing
+
+cdf and ppf use the scipy.special ufuncs ndtr / ndtri directly, which skips
+the argument handling scipy.stats.norm adds on every call.
+
+    python normal_kernels.py     # benchmark vs scipy.stats.norm and the scalar normal_pdf
+"""
+import math
+import time
+
+import numpy as np
+from scipy.special import ndtr, ndtri
+
+INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+LOG_SQRT_2PI = 0.5 * math.log(2.0 * math.pi)
+
+
+def _prepare_out(x, out, dtype):
+    x = np.asarray(x)
+    if out is None:
+        dtype = np.dtype(dtype) if dtype is not None else np.result_type(x.dtype, np.float64)
+        out = np.empty(x.shape, dtype=dtype)
+    return x, out
+
+
+def standardize(x, mean=0.0, std=1.0, out=None, dtype=None):
+    """z = (x - mean) / std, written into ``out``."""
+    x, out = _prepare_out(x, out, dtype)
+    np.subtract(x, mean, out=out)
+    out *= 1.0 / std
+    return out
+
+
+def pdf(x, mean=0.0, std=1.0, out=None, dtype=None):
+    """Normal probability density at every element of ``x``."""
+    out = standardize(x, mean, std, out, dtype)
+    np.square(out, out=out)
+    out *= -0.5
+    np.exp(out, out=out)
+    out *= INV_SQRT_2PI / std
+    return out
+
+
+def logpdf(x, mean=0.0, std=1.0, out=None, dtype=None):
+    """Log of the normal density; stays finite far in the tails."""
+    out = standardize(x, mean, std, out, dtype)
+    np.square(out, out=out)
+    out *= -0.5
+    out -= LOG_SQRT_2PI + math.log(std)
+    return out
+
+
+def cdf(x, mean=0.0, std=1.0, out=None, dtype=None):
+    """Normal cumulative probability P(X <= x)."""
+    out = standardize(x, mean, std, out, dtype)
+    return ndtr(out, out=out)
+
+
+def ppf(q, mean=0.0, std=1.0, out=None, dtype=None):
+    """Inverse cdf: the value with cumulative probability ``q``."""
+    q, out = _prepare_out(q, out, dtype)
+    ndtri(q, out=out)
+    out *= std
+    out += mean
+    return out
+
+
+def benchmark(sizes=(10, 1_000, 1_000_000), repeats=5):
+    """Seconds per call: scalar normal_pdf loop, scipy.stats.norm and these kernels."""
+    from scipy.stats import norm
+
+    def normal_pdf(x, mean, std_dev):
+        # The manual scalar formula from pdf.py
+        exponent = math.exp(-((x - mean) ** 2) / (2 * std_dev ** 2))
+        return (1 / (math.sqrt(2 * math.pi) * std_dev)) * exponent
+
+    def best_time(fn):
+        times = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        return min(times)
+
+    mean, std = 170.0, 10.0
+    print(f"{'Size':>10} {'Function':<28} {'Seconds':>12} {'vs scipy':>9}")
+    print("-" * 62)
+    for size in sizes:
+        x = np.linspace(mean - 4 * std, mean + 4 * std, size)
+        buf64 = np.empty(size)
+        buf32 = np.empty(size, dtype=np.float32)
+        cases = [
+            ('scipy.stats.norm.pdf', lambda: norm.pdf(x, mean, std)),
+            ('scalar normal_pdf loop', lambda: [normal_pdf(v, mean, std) for v in x]),
+            ('kernels.pdf', lambda: pdf(x, mean, std)),
+            ('kernels.pdf float32', lambda: pdf(x, mean, std, dtype=np.float32)),
+            ('kernels.pdf out=', lambda: pdf(x, mean, std, out=buf64)),
+            ('kernels.pdf float32 out=', lambda: pdf(x, mean, std, out=buf32)),
+            ('scipy.stats.norm.cdf', lambda: norm.cdf(x, mean, std)),
+            ('kernels.cdf out=', lambda: cdf(x, mean, std, out=buf64)),
+        ]
+        reference = {}
+        for name, fn in cases:
+            if name.startswith('scalar') and size > 100_000:
+                continue
+            seconds = best_time(fn)
+            # Compare each kernel with the scipy.stats call it replaces
+            kind = 'cdf' if 'cdf' in name else 'pdf'
+            reference.setdefault(kind, seconds)
+            print(f"{size:>10,} {name:<28} {seconds:12.2e} {reference[kind] / seconds:8.1f}x")
+        err = np.abs(pdf(x, mean, std) - norm.pdf(x, mean, std)).max()
+        print(f"{'':>10} max |kernels.pdf - norm.pdf| = {err:.1e}\n")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -2,9 +2,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 import math
 
-# 🧮 PDF formula (manual implementation)
+# 🧮 PDF formula (manual implementation, works on scalars and whole arrays)
 def normal_pdf(x, mean, std_dev):
-    exponent = math.exp(-((x - mean) ** 2) / (2 * std_dev ** 2))
+    exponent = np.exp(-((x - mean) ** 2) / (2 * std_dev ** 2))
     return (1 / (math.sqrt(2 * math.pi) * std_dev)) * exponent
 
 # 🧠 Set mean and standard deviation
@@ -19,7 +19,7 @@ print(f"PDF at x = {x_point}: {pdf_value:.4f}")
 
 # 📊 Plot the PDF curve
 x_values = np.linspace(mean - 4*std_dev, mean + 4*std_dev, 100)
-y_values = [normal_pdf(x, mean, std_dev) for x in x_values]
+y_values = normal_pdf(x_values, mean, std_dev)  # one vectorized call, no Python loop
 
 plt.plot(x_values, y_values, label="Normal PDF", color='blue')
 plt.axvline(x_point, color='red', linestyle='--', label=f"x = {x_point}")
@@ -1,5 +1,5 @@
 import numpy as np
-from scipy.stats import norm
+import normal_kernels
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -28,11 +28,11 @@ std = df['Score'].std()
 # Z-score calculation
 df['Z-score'] = (df['Score'] - mean) / std
 
-# Add percentile using CDF from Z-score
-df['Percentile'] = df['Z-score'].apply(lambda z: round(norm.cdf(z) * 100, 2))
+# Add percentile using CDF from Z-score (vectorized over the whole column)
+df['Percentile'] = (normal_kernels.cdf(df['Z-score'].to_numpy()) * 100).round(2)
 
 # Label outliers
-df['Remark'] = df['Z-score'].apply(lambda z: 'Outlier' if abs(z) > 2 else 'Normal')
+df['Remark'] = np.where(df['Z-score'].abs() > 2, 'Outlier', 'Normal')
 
 # Display the result with better formatting
 pd.set_option('display.max_columns', None)
@@ -0,0 +1,152 @@
+"""
+Streaming Z-Score Report
+------------------------
+The z-score report from z-score.py for very large populations (~10^8 exam
+records) that do not fit in a DataFrame.
+
+1. One pass over the input in chunks gets the count, mean and variance.
+   It uses Welford's update, and the per-chunk moments merge exactly (Chan et al.).
+2. A second streaming pass computes z-scores, CDF percentiles
+   (normal_kernels.cdf) and outlier flags as whole-array operations and
+   appends each chunk to the report.
+
+    python zscore_report.py scores.csv report.csv
+    python zscore_report.py --benchmark --rows 1e6
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import normal_kernels
+
+
+class RunningMoments:
+    """Mergeable count / mean / sum of squared deviations (Welford)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return self
+        other = RunningMoments()
+        other.count = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        return self.merge(other)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        return self
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1, like pandas .std())."""
+        return (self.m2 / (self.count - 1)) ** 0.5 if self.count > 1 else float('nan')
+
+
+def score_block(scores, mean, std, threshold=2.0):
+    """Vectorized z-score, percentile and remark for one block of scores."""
+    z = (np.asarray(scores, dtype=np.float64) - mean) / std
+    percentile = np.round(normal_kernels.cdf(z) * 100, 2)
+    remark = np.where(np.abs(z) > threshold, 'Outlier', 'Normal')
+    return z, percentile, remark
+
+
+def compute_moments(path, column='Score', chunksize=1_000_000):
+    """Pass 1: mean and variance of one column in a single streaming pass."""
+    moments = RunningMoments()
+    for chunk in pd.read_csv(path, usecols=[column], chunksize=chunksize):
+        moments.update(chunk[column].to_numpy())
+    return moments
+
+
+def write_report(path, output_path, column='Score', chunksize=1_000_000, threshold=2.0):
+    """Pass 2: stream the z-score report to ``output_path``; returns the moments."""
+    moments = compute_moments(path, column, chunksize)
+    mean, std = moments.mean, moments.std
+    with open(output_path, 'w', buffering=1 << 20) as out:
+        header = True
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            z, percentile, remark = score_block(chunk[column].to_numpy(), mean, std, threshold)
+            chunk['Z-score'] = z
+            chunk['Percentile'] = percentile
+            chunk['Remark'] = remark
+            chunk.to_csv(out, index=False, header=header)
+            header = False
+    return moments
+
+
+def apply_report(df):
+    """The current z-score.py path: separate passes plus one Python call per row."""
+    from scipy.stats import norm
+
+    mean = df['Score'].mean()
+    std = df['Score'].std()
+    df['Z-score'] = (df['Score'] - mean) / std
+    df['Percentile'] = df['Z-score'].apply(lambda z: round(norm.cdf(z) * 100, 2))
+    df['Remark'] = df['Z-score'].apply(lambda z: 'Outlier' if abs(z) > 2 else 'Normal')
+    return df
+
+
+def benchmark(n_rows=1_000_000, apply_rows=100_000, seed=42):
+    """Rows/sec of the apply path vs the vectorized one-pass path."""
+    rng = np.random.default_rng(seed)
+    scores = np.clip(rng.normal(65, 15, n_rows), 0, 100).round()
+
+    df = pd.DataFrame({'Name': np.arange(apply_rows), 'Score': scores[:apply_rows]})
+    t0 = time.perf_counter()
+    expected = apply_report(df)
+    apply_rate = apply_rows / (time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    moments = RunningMoments()
+    for start in range(0, n_rows, 1_000_000):
+        moments.update(scores[start:start + 1_000_000])
+    for start in range(0, n_rows, 1_000_000):
+        score_block(scores[start:start + 1_000_000], moments.mean, moments.std)
+    vector_rate = n_rows / (time.perf_counter() - t0)
+
+    # Same numbers as the apply path on the rows both computed
+    check = RunningMoments().update(scores[:apply_rows])
+    z, percentile, remark = score_block(scores[:apply_rows], check.mean, check.std)
+    same = (np.allclose(z, expected['Z-score']) and
+            np.array_equal(percentile, expected['Percentile'].to_numpy()) and
+            np.array_equal(remark, expected['Remark'].to_numpy()))
+
+    print(f"{'Path':<24} {'Rows':>12} {'Rows/sec':>14}")
+    print("-" * 52)
+    print(f"{'DataFrame.apply':<24} {apply_rows:>12,} {apply_rate:>14,.0f}")
+    print(f"{'vectorized one-pass':<24} {n_rows:>12,} {vector_rate:>14,.0f}")
+    print(f"\nSpeedup: {vector_rate / apply_rate:.0f}x, results match: {same}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming z-score report")
+    parser.add_argument('input', nargs='?', help="CSV with Name and Score columns")
+    parser.add_argument('output', nargs='?', default='zscore_report.csv')
+    parser.add_argument('--column', default='Score')
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    parser.add_argument('--benchmark', action='store_true')
+    parser.add_argument('--rows', type=float, default=1e6)
+    args = parser.parse_args()
+
+    if args.benchmark or not args.input:
+        benchmark(int(args.rows))
+    else:
+        moments = write_report(args.input, args.output, args.column, args.chunksize)
+        print(f"\n📊 Z-score report for {moments.count:,} records written to {args.output}")
+        print(f"Mean Score: {moments.mean:.2f}")
+        print(f"Standard Deviation: {moments.std:.2f}")
+        print("\nℹ️ Note: Outliers are marked where |Z-score| > 2")
@@ -0,0 +1,371 @@
+"""
+Central Limit Theorem Simulation
+--------------------------------
+Monte Carlo sampling distributions of the sample mean, for sizing A/B
+tests: how large must n be before x̄ is close enough to normal for a
+z-test on Bernoulli conversions, normal metrics or skewed revenue?
+
+For every source and sample size n, millions of replications of x̄ are
+drawn and summarised in standard-error units, z = (x̄ - μ) / (σ / √n):
+
+- bias and SD ratio (should be 0 and 1),
+- skewness and excess kurtosis next to the theory (γ₁/√n and γ₂/n),
+- Kolmogorov distance sup |F(z) - Φ(z)| to the normal approximation, on
+  a 0.005-wide z grid,
+- the two-sided 5% tail rate P(|z| > 1.96), i.e. the real type I error
+  of a nominal 5% z-test,
+- the Berry–Esseen bound 0.4748·ρ / (σ³√n), where a closed form for ρ is
+  known.
+
+Replications are generated as (replications x n) matrices in chunks of at
+most max_elements draws. Each chunk fills one preallocated buffer, so the
+memory use does not depend on the number of replications. Where the
+distribution of x̄ is known exactly, method='auto' samples x̄ directly:
+Binomial(n, p)/n, Normal(μ, σ/√n) and Gamma(n, θ)/n. That is O(1) per
+replication instead of O(n). Lognormal always uses the matrix path.
+
+Replications are split into tasks of task_reps and run in a process
+pool. Task t of configuration (source i, size j) draws from
+SeedSequence(seed, spawn_key=(i, j, t)), so the streams are independent
+and the results are the same for any number of workers. Every summary
+is made of plain sums and histogram counts, so task results merge by
+addition.
+
+    python clt_simulation.py --reps 1e6 --sizes 10 30 100 1000
+    python clt_simulation.py --sources bernoulli --p 0.02 --sizes 100 500 2000 --workers 4
+    python clt_simulation.py --benchmark
+"""
+import argparse
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.special import ndtr, ndtri
+
+Z_LOW, Z_HIGH, Z_STEP = -8.0, 8.0, 0.005
+Z_EDGES = np.linspace(Z_LOW, Z_HIGH, int(round((Z_HIGH - Z_LOW) / Z_STEP)) + 1)
+Z_CRIT = float(ndtri(0.975))
+BERRY_ESSEEN_C = 0.4748
+
+
+# -- sources -----------------------------------------------------------------
+
+class Bernoulli:
+    """Conversions: 1 with probability p."""
+
+    def __init__(self, p=0.1):
+        self.p = p
+        self.name = f'bernoulli(p={p:g})'
+        self.mean = p
+        self.std = math.sqrt(p * (1 - p))
+        self.skew = (1 - 2 * p) / self.std
+        self.excess_kurtosis = (1 - 6 * p * (1 - p)) / (p * (1 - p))
+        self.abs_moment3 = p * (1 - p) * (p ** 2 + (1 - p) ** 2)
+
+    def chunk_means(self, rng, buffer):
+        rng.random(out=buffer)
+        return np.count_nonzero(buffer < self.p, axis=1) / buffer.shape[1]
+
+    def exact_means(self, rng, n, reps):
+        return rng.binomial(n, self.p, reps) / n
+
+
+class Normal:
+    """A metric that is already normal; the CLT holds exactly for every n."""
+
+    def __init__(self, mu=0.0, sigma=1.0):
+        self.mu, self.sigma = mu, sigma
+        self.name = f'normal(mu={mu:g}, sigma={sigma:g})'
+        self.mean = mu
+        self.std = sigma
+        self.skew = 0.0
+        self.excess_kurtosis = 0.0
+        self.abs_moment3 = 2 * math.sqrt(2 / math.pi) * sigma ** 3
+
+    def chunk_means(self, rng, buffer):
+        rng.standard_normal(out=buffer)
+        return buffer.mean(axis=1) * self.sigma + self.mu
+
+    def exact_means(self, rng, n, reps):
+        return rng.normal(self.mu, self.sigma / math.sqrt(n), reps)
+
+
+class Exponential:
+    """Skewed waiting times or revenue (skewness 2)."""
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self.name = f'exponential(scale={scale:g})'
+        self.mean = scale
+        self.std = scale
+        self.skew = 2.0
+        self.excess_kurtosis = 6.0
+        self.abs_moment3 = (12 / math.e - 2) * scale ** 3
+
+    def chunk_means(self, rng, buffer):
+        rng.standard_exponential(out=buffer)
+        return buffer.mean(axis=1) * self.scale
+
+    def exact_means(self, rng, n, reps):
+        return rng.gamma(n, self.scale, reps) / n
+
+
+class LogNormal:
+    """Heavy right tail, e.g. order values; x̄ converges slowly."""
+
+    def __init__(self, mu=0.0, sigma=1.0):
+        self.mu, self.sigma = mu, sigma
+        self.name = f'lognormal(mu={mu:g}, sigma={sigma:g})'
+        w = math.exp(sigma ** 2)
+        self.mean = math.exp(mu + sigma ** 2 / 2)
+        self.std = math.sqrt((w - 1) * math.exp(2 * mu + sigma ** 2))
+        self.skew = (w + 2) * math.sqrt(w - 1)
+        self.excess_kurtosis = w ** 4 + 2 * w ** 3 + 3 * w ** 2 - 6
+        self.abs_moment3 = None
+
+    def chunk_means(self, rng, buffer):
+        rng.standard_normal(out=buffer)
+        buffer *= self.sigma
+        buffer += self.mu
+        np.exp(buffer, out=buffer)
+        return buffer.mean(axis=1)
+
+    exact_means = None
+
+
+SOURCES = {'bernoulli': Bernoulli, 'normal': Normal, 'exponential': Exponential,
+           'lognormal': LogNormal}
+
+
+def make_source(name, p=0.1):
+    return Bernoulli(p) if name == 'bernoulli' else SOURCES[name]()
+
+
+# -- mergeable summary -------------------------------------------------------
+
+class SamplingDistribution:
+    """Power sums and a z histogram of standardized sample means; merges by addition.
+
+    z is O(1), so raw power sums up to z⁴ are accurate in float64 even
+    for billions of replications.
+    """
+
+    def __init__(self, source, n):
+        self.source = source
+        self.n = n
+        self.count = 0
+        self.sums = np.zeros(4)
+        self.hist = np.zeros(len(Z_EDGES) + 1, dtype=np.int64)
+        self.tail = 0
+
+    def update(self, means):
+        z = (means - self.source.mean) * (math.sqrt(self.n) / self.source.std)
+        self.count += len(z)
+        power = z.copy()
+        for k in range(4):
+            self.sums[k] += power.sum()
+            if k < 3:
+                power *= z
+        # Bin i + 1 counts Z_EDGES[i] < z <= Z_EDGES[i + 1]; 0 and -1 are the outer tails
+        self.hist += np.bincount(np.searchsorted(Z_EDGES, z, side='left'),
+                                 minlength=len(self.hist))
+        self.tail += int(np.count_nonzero(np.abs(z) > Z_CRIT))
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.sums += other.sums
+        self.hist += other.hist
+        self.tail += other.tail
+        return self
+
+    def metrics(self):
+        m1, m2, m3, m4 = self.sums / self.count
+        var = m2 - m1 ** 2
+        central3 = m3 - 3 * m1 * m2 + 2 * m1 ** 3
+        central4 = m4 - 4 * m1 * m3 + 6 * m1 ** 2 * m2 - 3 * m1 ** 4
+        # Empirical CDF at every grid edge vs the normal CDF
+        ecdf = np.cumsum(self.hist[:-1]) / self.count
+        ks = float(np.max(np.abs(ecdf - ndtr(Z_EDGES))))
+        source, root_n = self.source, math.sqrt(self.n)
+        bound = (BERRY_ESSEEN_C * source.abs_moment3 / (source.std ** 3 * root_n)
+                 if source.abs_moment3 is not None else None)
+        return {'source': source.name, 'n': self.n, 'reps': self.count,
+                'bias_se': m1, 'sd_ratio': math.sqrt(var),
+                'skew': central3 / var ** 1.5, 'skew_theory': source.skew / root_n,
+                'excess_kurtosis': central4 / var ** 2 - 3,
+                'excess_kurtosis_theory': source.excess_kurtosis / self.n,
+                'ks': ks, 'tail_rate': self.tail / self.count, 'berry_esseen': bound}
+
+
+# -- engine ------------------------------------------------------------------
+
+def simulate_task(source, n, reps, seed_key, seed=42, method='auto', max_elements=2**22):
+    """Worker: ``reps`` replications of x̄ for one (source, n), in bounded chunks."""
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=seed_key))
+    result = SamplingDistribution(source, n)
+    if method == 'auto' and source.exact_means is not None:
+        chunk = max(1, max_elements)
+        for start in range(0, reps, chunk):
+            result.update(source.exact_means(rng, n, min(chunk, reps - start)))
+        return result
+    chunk = max(1, min(reps, max_elements // n))
+    buffer = np.empty(chunk * n)
+    for start in range(0, reps, chunk):
+        r = min(chunk, reps - start)
+        result.update(source.chunk_means(rng, buffer[:r * n].reshape(r, n)))
+    return result
+
+
+def _simulate_task_star(args):
+    return simulate_task(*args)
+
+
+def simulate(sources, sizes, reps, workers=None, seed=42, method='auto',
+             max_elements=2**22, task_reps=1_000_000):
+    """Sampling distributions of every (source, n), merged in task order."""
+    configs, tasks = [], []
+    for i, source in enumerate(sources):
+        for j, n in enumerate(sizes):
+            first = len(tasks)
+            for t, start in enumerate(range(0, reps, task_reps)):
+                tasks.append((source, n, min(task_reps, reps - start), (i, j, t), seed,
+                              method, max_elements))
+            configs.append((source, n, first, len(tasks)))
+    if workers == 1:
+        results = [_simulate_task_star(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_task_star, tasks))
+    merged = []
+    for source, n, first, last in configs:
+        total = SamplingDistribution(source, n)
+        for result in results[first:last]:
+            total.merge(result)
+        merged.append(total)
+    return merged
+
+
+def smallest_adequate_n(metrics, tolerance=0.005):
+    """Per source, the smallest simulated n from which on the type I error of
+    a two-sided 5% z-test stays within ``tolerance`` (at every larger n too).
+
+    KS is not used here: for lattice sources such as Bernoulli it is
+    dominated by the jumps of the discrete distribution, and the tail rate
+    of a lattice source can land near 5% by chance at one n and miss at
+    the next, hence the "every larger n" condition.
+    """
+    by_source = {}
+    for m in metrics:
+        by_source.setdefault(m['source'], []).append(m)
+    adequate = {}
+    for name, rows in by_source.items():
+        adequate[name] = None
+        for m in sorted(rows, key=lambda m: m['n'], reverse=True):
+            if abs(m['tail_rate'] - 0.05) > tolerance:
+                break
+            adequate[name] = m['n']
+    return adequate
+
+
+def format_report(metrics):
+    lines = [f"{'Source':<30} {'n':>6} {'Reps':>11} {'Bias':>7} {'SD':>6} {'Skew':>7} "
+             f"{'(theory)':>8} {'ExKurt':>7} {'(theory)':>8} {'KS':>7} {'P(|z|>1.96)':>11} "
+             f"{'B-E bound':>9}",
+             "-" * 139]
+    for m in metrics:
+        bound = f"{m['berry_esseen']:9.4f}" if m['berry_esseen'] is not None else f"{'-':>9}"
+        lines.append(f"{m['source']:<30} {m['n']:>6} {m['reps']:>11,} {m['bias_se']:7.4f} "
+                     f"{m['sd_ratio']:6.4f} {m['skew']:7.4f} {m['skew_theory']:8.4f} "
+                     f"{m['excess_kurtosis']:7.3f} {m['excess_kurtosis_theory']:8.3f} "
+                     f"{m['ks']:7.4f} {m['tail_rate']:11.4f} {bound}")
+    return '\n'.join(lines)
+
+
+def plot_distributions(results, path):
+    """Histogram of z for every (source, n) against the standard normal density."""
+    import matplotlib.pyplot as plt
+
+    sources = list(dict.fromkeys(r.source.name for r in results))
+    sizes = list(dict.fromkeys(r.n for r in results))
+    fig, axes = plt.subplots(len(sources), len(sizes), squeeze=False,
+                             figsize=(3.2 * len(sizes), 2.6 * len(sources)), sharex=True)
+    centres = (Z_EDGES[:-1] + Z_EDGES[1:]) / 2
+    density = np.exp(-centres ** 2 / 2) / math.sqrt(2 * math.pi)
+    for r in results:
+        ax = axes[sources.index(r.source.name)][sizes.index(r.n)]
+        # Coarsen the fine grid to 0.1-wide bars for display
+        factor = 20
+        counts = r.hist[1:-1].reshape(-1, factor).sum(axis=1) / (r.count * Z_STEP * factor)
+        ax.bar(centres.reshape(-1, factor).mean(axis=1), counts, width=Z_STEP * factor,
+               color='skyblue', edgecolor='none')
+        ax.plot(centres, density, color='red', linewidth=1)
+        ax.set_xlim(-4, 4)
+        ax.set_title(f"{r.source.name}, n={r.n}", fontsize=8)
+    fig.suptitle('Sampling distribution of the mean (z units) vs N(0, 1)')
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    plt.close(fig)
+    return path
+
+
+def benchmark(reps=100_000, n=1000, p=0.1):
+    """Per-replication loop vs chunked matrices vs exact sampling of x̄."""
+    source = Bernoulli(p)
+    rng = np.random.default_rng(42)
+
+    t0 = time.perf_counter()
+    loop_means = np.array([(rng.random(n) < p).mean() for _ in range(reps)])
+    loop = time.perf_counter() - t0
+    SamplingDistribution(source, n).update(loop_means)
+
+    t0 = time.perf_counter()
+    matrix = simulate_task(source, n, reps, (0,), method='matrix')
+    chunked = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    exact = simulate_task(source, n, reps, (0,), method='auto')
+    direct = time.perf_counter() - t0
+
+    print(f"{source.name}, n={n}, {reps:,} replications ({reps * n:,} draws)")
+    print(f"  per-replication Python loop:   {loop:7.3f} s")
+    print(f"  chunked (reps x n) matrices:   {chunked:7.3f} s ({reps * n / chunked:,.0f} draws/s)")
+    print(f"  exact Binomial(n, p)/n:        {direct:7.3f} s")
+    print(f"  KS distance matrix vs exact: {matrix.metrics()['ks']:.4f} vs "
+          f"{exact.metrics()['ks']:.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CLT sampling-distribution simulations")
+    parser.add_argument('--sources', nargs='+', choices=sorted(SOURCES),
+                        default=['bernoulli', 'normal', 'exponential', 'lognormal'])
+    parser.add_argument('--p', type=float, default=0.1, help="Bernoulli success probability")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[5, 30, 100, 1000])
+    parser.add_argument('--reps', type=float, default=1e5, help="replications per (source, n)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--method', choices=['auto', 'matrix'], default='auto',
+                        help="'matrix' always draws every observation, even when x̄ has a known law")
+    parser.add_argument('--max-elements', type=float, default=2**22,
+                        help="draws per chunk (bounds memory per worker)")
+    parser.add_argument('--plot', default=None, metavar='PATH', help="save histograms of z")
+    parser.add_argument('--benchmark', action='store_true')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        sources = [make_source(name, args.p) for name in args.sources]
+        t0 = time.perf_counter()
+        results = simulate(sources, args.sizes, int(args.reps), args.workers, args.seed,
+                           args.method, int(args.max_elements))
+        elapsed = time.perf_counter() - t0
+        metrics = [r.metrics() for r in results]
+        print(format_report(metrics))
+        print(f"\n{len(results)} sampling distributions in {elapsed:.2f} s")
+        print("\nSmallest simulated n from which on a nominal 5% z-test rejects 4.5-5.5% of the time:")
+        for name, n in smallest_adequate_n(metrics).items():
+            print(f"  {name:<30} {n if n is not None else 'none of ' + str(args.sizes)}")
+        if args.plot:
+            print(f"\nHistograms saved to {plot_distributions(results, args.plot)}")
@@ -1,18 +1,33 @@
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score
-import joblib
 import os
 from datetime import datetime
-import matplotlib.pyplot as plt
+import argparse
+from streaming_ols import (FEATURE_COLUMNS, TARGET_COLUMN, SufficientStats, iter_chunks,
+                           holdout_mask, accumulate, solve_ols, evaluate,
+                           to_linear_regression)
+from parallel_training import find_shards, iter_shard_chunks, parallel_statistics, tree_reduce
+from batch_scoring import score_file
+from model_registry import ModelRegistry
+from columnar_store import read_table
+from streaming_metrics import StreamingMetrics
+from incremental_model import IncrementalLinearModel, state_path_for
+from pipeline_trace import tracer
+from cross_validation import (fold_statistics, parallel_fold_statistics, cross_validate,
+                              print_report)
+from model_export import export_model, export_path_for
+from pipeline_cache import PipelineCache, code_hash, evict_stale, model_artifacts
+from permutation_importance import permutation_importance, plot_importance
+
+# scikit-learn, joblib and matplotlib are imported inside the functions that
+# use them, so scoring and registry tools that import this module start fast
 
 # Create output directories
 os.makedirs('data', exist_ok=True)
 os.makedirs('models', exist_ok=True)
 os.makedirs('predictions', exist_ok=True)
 
+@tracer.traced()
 def generate_sample_data(n_samples=1000):
     """Generate sample data for house price prediction"""
     np.random.seed(42)
@@ -38,48 +53,200 @@ def generate_sample_data(n_samples=1000):
     print(f"Generated {n_samples} samples in data/house_prices.csv")
     return data
 
-def train_batch_model():
+@tracer.traced()
+def train_batch_model(data_path='data/house_prices.csv'):
     """Train a model using batch processing"""
+    from sklearn.model_selection import train_test_split
+    from sklearn.linear_model import LinearRegression
+    
     print("\n=== Starting Batch Training ===")
     
-    # Load data
-    data = pd.read_csv('data/house_prices.csv')
+    # Load data (CSV or columnar binary)
+    with tracer.span('load_data') as span:
+        data = read_table(data_path)
+        span.rows = len(data)
     
     # Prepare features and target
     X = data[['size_sqft', 'bedrooms', 'age_years']]
     y = data['price']
     
     # Split data
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    with tracer.span('split', rows=len(X)):
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
     # Train model
-    model = LinearRegression()
-    model.fit(X_train, y_train)
+    with tracer.span('fit', rows=len(X_train)):
+        model = LinearRegression()
+        model.fit(X_train, y_train)
+    
+    # Evaluate chunk by chunk with running metrics
+    with tracer.span('evaluate', rows=len(X_test)):
+        metrics = StreamingMetrics()
+        for start in range(0, len(X_test), 100_000):
+            metrics.update(y_test[start:start + 100_000],
+                           model.predict(X_test[start:start + 100_000]))
+        mse, r2 = metrics.mse, metrics.r2
+    
+    print(f"Trained model with MSE: {mse:.2f}, R²: {r2:.4f}")
+    print(f"Absolute error p50/p95/p99: {metrics.quantile(0.5):,.0f} / "
+          f"{metrics.quantile(0.95):,.0f} / {metrics.quantile(0.99):,.0f}")
+    
+    # Keep the sufficient statistics so the model can be updated incrementally
+    with tracer.span('sufficient_stats', rows=len(X_train)):
+        state = SufficientStats.from_array(np.column_stack([X_train, y_train]))
+    return save_model(model, X_train.columns, {'mse': mse, 'r2': r2}, data_path, state)
+
+@tracer.traced()
+def train_streaming_model(data_path='data/house_prices.csv', chunksize=100_000,
+                          test_size=0.2, seed=42):
+    """Train the same linear model out-of-core from chunked sufficient statistics"""
+    print("\n=== Starting Streaming Training ===")
     
-    # Evaluate
-    y_pred = model.predict(X_test)
-    mse = mean_squared_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
+    # Reduce the file to train/held-out statistics, one chunk at a time
+    columns = FEATURE_COLUMNS + [TARGET_COLUMN]
+    with tracer.span('read_and_accumulate') as span:
+        train, test = accumulate(iter_chunks(data_path, columns, chunksize),
+                                 test_size=test_size, seed=seed)
+        span.rows = int(train.count + test.count)
     
+    # Solve the normal equations and score the held-out rows
+    with tracer.span('solve_and_evaluate'):
+        coef, intercept = solve_ols(train)
+        mse, r2 = evaluate(test, coef, intercept)
+    print(f"Streamed {train.count + test.count} rows "
+          f"({train.count} train / {test.count} held out)")
     print(f"Trained model with MSE: {mse:.2f}, R²: {r2:.4f}")
     
-    # Save model with timestamp
+    model = to_linear_regression(coef, intercept, FEATURE_COLUMNS)
+    return save_model(model, FEATURE_COLUMNS, {'mse': mse, 'r2': r2}, data_path, train)
+
+@tracer.traced()
+def train_parallel_model(pattern='data/house_prices*.csv', workers=None):
+    """Train from every matching CSV shard across a process pool"""
+    print("\n=== Starting Parallel Training ===")
+    
+    shards = find_shards(pattern)
+    if not shards:
+        raise FileNotFoundError(f"No shards match {pattern}")
+    with tracer.span('parallel_statistics') as span:
+        train, test = parallel_statistics(shards, workers)
+        span.rows = int(train.count + test.count)
+    with tracer.span('solve_and_evaluate'):
+        coef, intercept = solve_ols(train)
+        mse, r2 = evaluate(test, coef, intercept)
+    print(f"Read {len(shards)} shard(s): {train.count} train / {test.count} held out rows")
+    print(f"Trained model with MSE: {mse:.2f}, R²: {r2:.4f}")
+    
+    model = to_linear_regression(coef, intercept, FEATURE_COLUMNS)
+    return save_model(model, FEATURE_COLUMNS, {'mse': mse, 'r2': r2}, shards, train)
+
+@tracer.traced()
+def train_cv_model(data_path='data/house_prices.csv', n_folds=10, chunksize=100_000,
+                   workers=None, pattern=None):
+    """k-fold cross-validate from one pass of per-fold statistics, then fit on all rows"""
+    print(f"\n=== Starting {n_folds}-Fold Cross-Validation ===")
+    
+    # One pass: every fold reduced to its own sufficient statistics
+    with tracer.span('fold_statistics') as span:
+        if pattern:
+            sources = find_shards(pattern)
+            if not sources:
+                raise FileNotFoundError(f"No shards match {pattern}")
+            folds = parallel_fold_statistics(sources, n_folds, workers)
+        else:
+            sources = data_path
+            columns = FEATURE_COLUMNS + [TARGET_COLUMN]
+            folds = fold_statistics(iter_chunks(data_path, columns, chunksize), n_folds)
+        span.rows = int(sum(fold.count for fold in folds))
+    
+    # Fold i trains on total - fold i, so no refits over the data
+    with tracer.span('score_folds'):
+        results, summary = cross_validate(folds, workers)
+    print_report(results, summary)
+    
+    # The final model uses every row
+    total = tree_reduce(folds)
+    coef, intercept = solve_ols(total)
+    model = to_linear_regression(coef, intercept, FEATURE_COLUMNS)
+    metrics = {'mse': summary['mse_mean'], 'r2': summary['r2_mean'],
+               'cv_folds': n_folds, 'cv_mse_std': summary['mse_std'], 'cv_r2_std': summary['r2_std']}
+    return save_model(model, FEATURE_COLUMNS, metrics, sources, total)
+
+@tracer.traced()
+def train_incremental_model(delta_path, base='current', forgetting_factor=None,
+                            chunksize=100_000):
+    """Fold only the new rows in ``delta_path`` into an existing model"""
+    print("\n=== Starting Incremental Training ===")
+    
+    # Resume from the state saved next to the base model
+    entry = ModelRegistry('models').resolve(base)
+    state_path = state_path_for(entry['path'])
+    if not os.path.exists(state_path):
+        raise FileNotFoundError(f"{entry['path']} has no saved state ({state_path})")
+    incremental = IncrementalLinearModel.load_state(state_path)
+    if forgetting_factor is not None:
+        incremental.forgetting_factor = forgetting_factor
+    print(f"Resuming from {entry['path']} ({incremental.stats.count:.0f} weighted rows)")
+    
+    # Update on the delta's training rows and score its held-out rows
+    columns = FEATURE_COLUMNS + [TARGET_COLUMN]
+    test = SufficientStats(len(columns))
+    n_new = 0
+    with tracer.span('partial_fit') as span:
+        for start, block in iter_chunks(delta_path, columns, chunksize):
+            mask = holdout_mask(start, len(block))
+            incremental.partial_fit(block[~mask, :-1], block[~mask, -1])
+            test.update(block[mask])
+            n_new += len(block)
+        span.rows = n_new
+    mse, r2 = evaluate(test, incremental.coef_, incremental.intercept_)
+    print(f"Folded in {n_new} new rows ({test.count} held out)")
+    print(f"Updated model with MSE: {mse:.2f}, R²: {r2:.4f}")
+    
+    model = incremental.to_linear_regression()
+    return save_model(model, FEATURE_COLUMNS, {'mse': mse, 'r2': r2}, delta_path,
+                      incremental.stats, incremental.forgetting_factor)
+
+@tracer.traced()
+def save_model(model, feature_names, metrics=None, data_path=None, state=None,
+               forgetting_factor=1.0):
+    """Save the model with a timestamp, export it and register it"""
+    import joblib
+    
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     model_path = f'models/house_price_model_{timestamp}.joblib'
-    joblib.dump(model, model_path)
+    with tracer.span('joblib_dump'):
+        joblib.dump(model, model_path)
     print(f"Model saved to {model_path}")
     
-    # Plot feature importance
-    plot_feature_importance(model, X_train.columns)
+    # Lightweight export for NumPy-only scoring (fast_score.py)
+    with tracer.span('export'):
+        export_path = export_model(model, feature_names, export_path_for(model_path))
+    print(f"Model exported to {export_path}")
+    
+    # Persist the training statistics for later incremental updates
+    if state is not None:
+        with tracer.span('save_state'):
+            incremental = IncrementalLinearModel.from_stats(state, list(feature_names),
+                                                            forgetting_factor)
+            incremental.save_state(state_path_for(model_path))
+    
+    # Index the artifact and make it the current model for consumers
+    with tracer.span('register'):
+        ModelRegistry('models').register(model_path, metrics, data_path)
     
     return model_path
 
+@tracer.traced()
 def make_predictions(model_path):
     """Make predictions using the trained model"""
+    import joblib
+    
     print("\n=== Making Predictions ===")
     
     # Load model
-    model = joblib.load(model_path)
+    with tracer.span('joblib_load'):
+        model = joblib.load(model_path)
     
     # Generate new data for prediction
     new_data = pd.DataFrame({
@@ -89,7 +256,8 @@ def make_predictions(model_path):
     })
     
     # Make predictions
-    predictions = model.predict(new_data)
+    with tracer.span('predict', rows=len(new_data)):
+        predictions = model.predict(new_data)
     
     # Create results DataFrame
     results = new_data.copy()
@@ -98,44 +266,241 @@ def make_predictions(model_path):
     # Save predictions
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     pred_path = f'predictions/predictions_{timestamp}.csv'
-    results.to_csv(pred_path, index=False)
+    with tracer.span('write_predictions', rows=len(results)):
+        results.to_csv(pred_path, index=False)
     
     print("Predictions made for new houses:")
     print(results)
     print(f"Predictions saved to {pred_path}")
     
-    return results
-
-def plot_feature_importance(model, feature_names):
-    """Plot feature importance for the model"""
-    if hasattr(model, 'coef_'):
-        plt.figure(figsize=(10, 6))
-        importance = pd.Series(model.coef_, index=feature_names)
-        importance = importance.sort_values()
-        importance.plot(kind='barh')
-        plt.title('Feature Importance (Coefficients)', fontsize=14)
-        plt.xlabel('Coefficient Value', fontsize=12)
-        plt.ylabel('Features', fontsize=12)
-        plt.tight_layout()
+    return pred_path
+
+@tracer.traced()
+def score_listings(model_path, input_path, chunksize=500_000):
+    """Batch-score a large CSV of listings in vectorized chunks"""
+    print("\n=== Batch Scoring ===")
+    
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    pred_path = f'predictions/scores_{timestamp}.csv'
+    with tracer.span('score_file') as span:
+        n_rows, rate = score_file(model_path, input_path, pred_path, chunksize)
+        span.rows = n_rows
+    print(f"Scored {n_rows} rows from {input_path} ({rate:,.0f} rows/sec)")
+    print(f"Scores saved to {pred_path}")
+    
+    return pred_path
+
+@tracer.traced()
+def plot_feature_importance(model, feature_names, X, y, n_repeats=30, workers=None,
+                            rows='held-out rows'):
+    """Plot permutation feature importance (increase in MSE) with 95% confidence intervals"""
+    import matplotlib.pyplot as plt
+    
+    # Raw coefficients depend on each feature's units; permutation importance does not
+    with tracer.span('permutation_importance', rows=len(X)):
+        importance = permutation_importance(model, X, y, n_repeats=n_repeats, workers=workers,
+                                            feature_names=list(feature_names))
+    print(f"Permutation importance on {len(X):,} {rows} ({n_repeats} repeats, "
+          f"baseline MSE {importance.attrs['baseline_mse']:,.0f}):")
+    print(importance.to_string(float_format=lambda v: f"{v:,.0f}"))
+    
+    fig, ax = plt.subplots(figsize=(10, 6))
+    plot_importance(ax, importance)
+    ax.set_title(f'Permutation Feature Importance (95% CI, {rows})', fontsize=14)
+    ax.set_xlabel('Increase in MSE when shuffled', fontsize=12)
+    ax.set_ylabel('Features', fontsize=12)
+    fig.tight_layout()
+    
+    # Save the plot
+    plot_path = 'models/feature_importance.png'
+    with tracer.span('savefig'):
+        fig.savefig(plot_path)
+    print(f"Feature importance plot saved to {plot_path}")
+    plt.close(fig)
+    return plot_path
+
+def make_current(model_path):
+    """Point the registry at a (possibly older, cached) model"""
+    registry = ModelRegistry('models')
+    try:
+        if registry.resolve('current')['path'] != model_path:
+            registry.promote(model_path)
+    except LookupError:
+        registry.register(model_path)
+
+def evaluation_rows(mode, data_path, shards=None, max_rows=1_000_000, chunksize=500_000):
+    """The rows a model trained in ``mode`` was evaluated on, as (X, y, description)
+    
+    batch: the train_test_split test rows; streaming/incremental/parallel: the
+    hash hold-out of --data or the shards; cv: the final model is fitted on
+    every row, so there are no held-out rows and the rows are in-sample.
+    """
+    columns = FEATURE_COLUMNS + [TARGET_COLUMN]
+    if mode == 'batch':
+        from sklearn.model_selection import train_test_split
         
-        # Save the plot
-        plot_path = 'models/feature_importance.png'
-        plt.savefig(plot_path)
-        print(f"Feature importance plot saved to {plot_path}")
-        plt.close()
+        # The split only depends on the row count, so replay it on row numbers
+        data = read_table(data_path)[columns].to_numpy(dtype=np.float64)
+        test_rows = train_test_split(np.arange(len(data)), test_size=0.2, random_state=42)[1]
+        rows = data[test_rows[:max_rows]]
+        return rows[:, :-1], rows[:, -1], 'test-split rows'
+    
+    if shards:
+        chunks = iter_shard_chunks(shards, columns, chunksize=chunksize)
+    else:
+        chunks = iter_chunks(data_path, columns, chunksize)
+    held_out = mode != 'cv'
+    blocks, n_rows = [], 0
+    for start, block in chunks:
+        blocks.append(block[holdout_mask(start, len(block))] if held_out else block)
+        n_rows += len(blocks[-1])
+        if n_rows >= max_rows:
+            break
+    rows = np.concatenate(blocks)[:max_rows]
+    return rows[:, :-1], rows[:, -1], 'held-out rows' if held_out else 'in-sample rows'
+
+def plot_model(model_path, mode, data_path, shards=None, max_rows=1_000_000):
+    """Plot the feature importance of a saved model on the rows it was evaluated on"""
+    import joblib
+    
+    model = joblib.load(model_path)
+    feature_names = list(getattr(model, 'feature_names_in_', FEATURE_COLUMNS))
+    with tracer.span('load_evaluation_rows') as span:
+        X, y, description = evaluation_rows(mode, data_path, shards, max_rows)
+        span.rows = len(X)
+    return plot_feature_importance(model, feature_names, X, y, rows=description)
+
+def stage_result(path, artifacts):
+    """(value, artifacts) for run_stage: the path a stage returned and the files it wrote"""
+    return path, artifacts(path) if callable(artifacts) else {artifacts: path}
+
+def run_stage(cache, stage, compute, params=None, inputs=(), code=()):
+    """Run one pipeline stage, or reuse its cached result when nothing it depends on changed.
+    
+    ``compute`` returns (value, {name: artifact path}); without a cache it just runs.
+    """
+    if cache is None:
+        return compute()[0]
+    with tracer.span('cache_key'):
+        key = cache.key(stage, params, inputs, code_hash(*code))
+    value, hit = cache.run(stage, key, compute)
+    if hit:
+        print(f"\n=== {stage.capitalize()}: inputs unchanged, reusing cached result ===")
+        if isinstance(value, str):
+            print(f"Reusing {value}")
+    return value
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch processing ML example")
+    parser.add_argument('--mode', choices=['batch', 'streaming', 'parallel', 'incremental', 'cv'],
+                        default='batch',
+                        help="'streaming' trains out-of-core in constant memory, "
+                             "'parallel' spreads CSV shards over a process pool, "
+                             "'incremental' folds --data (new rows only) into the current model, "
+                             "'cv' cross-validates from one pass and fits on all rows")
+    parser.add_argument('--folds', type=int, default=10,
+                        help="number of folds in cv mode")
+    parser.add_argument('--shards', default=None,
+                        help="glob of CSV shards to train on (parallel mode, default: --data) "
+                             "or cross-validate (cv mode) with --workers processes")
+    parser.add_argument('--forgetting-factor', type=float, default=None,
+                        help="per-row down-weighting of older sales in incremental mode")
+    parser.add_argument('--data', default='data/house_prices.csv',
+                        help="training data: a CSV or a columnar .cols directory")
+    parser.add_argument('--chunksize', type=int, default=100_000,
+                        help="rows per chunk in streaming mode")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes in parallel mode (default: all cores)")
+    parser.add_argument('--score-input', default=None,
+                        help="CSV of listings to batch-score instead of the 3 sample houses")
+    parser.add_argument('--trace', default=None, metavar='PATH',
+                        help="record stage timings/memory and write a JSON trace to PATH")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="always rerun every stage instead of reusing cached artifacts")
+    parser.add_argument('--cache-dir', default='.pipeline_cache')
+    parser.add_argument('--cache-max-mb', type=float, default=1024,
+                        help="evict least recently used cached artifacts beyond this size")
+    parser.add_argument('--cache-max-age-days', type=float, default=30,
+                        help="evict cached artifacts unused for this long")
+    args = parser.parse_args()
+    
+    if args.trace:
+        tracer.enable()
+    
     print("=== Batch Processing ML Example ===\n")
     
-    # Step 1: Generate sample data (if not exists)
-    if not os.path.exists('data/house_prices.csv'):
-        generate_sample_data()
+    # Stages are keyed on their inputs, parameters and code, so a scheduled
+    # rerun on unchanged data reuses the last artifacts instead of writing new ones
+    cache = None if args.no_cache else PipelineCache(args.cache_dir)
+    
+    # Step 1: Generate sample data (if not exists, or if an older generator wrote it untouched)
+    sample_path = 'data/house_prices.csv'
+    if not os.path.exists(sample_path) or (cache and cache.owner(sample_path, 'generate')):
+        run_stage(cache, 'generate', lambda: (len(generate_sample_data()), {'data': sample_path}),
+                  params={'n_samples': 1000}, code=[generate_sample_data])
+    
+    # Step 2: Train model in batch (or stream it in chunks)
+    if args.mode == 'streaming':
+        train = lambda: train_streaming_model(args.data, chunksize=args.chunksize)
+        params, inputs = {'chunksize': args.chunksize}, [args.data]
+    elif args.mode == 'cv':
+        train = lambda: train_cv_model(args.data, args.folds, args.chunksize, args.workers,
+                                       args.shards)
+        params = {'folds': args.folds, 'chunksize': args.chunksize, 'shards': args.shards}
+        inputs = [find_shards(args.shards)] if args.shards else [args.data]
+    elif args.mode == 'parallel':
+        pattern = args.shards or args.data
+        train = lambda: train_parallel_model(pattern, workers=args.workers)
+        params, inputs = {'shards': pattern}, [find_shards(pattern)]
+    else:
+        train = lambda: train_batch_model(args.data)
+        params, inputs = {}, [args.data]
     
-    # Step 2: Train model in batch
-    model_path = train_batch_model()
+    if args.mode == 'incremental':
+        # Folding a delta in is an update of the current model, never a cache hit
+        model_path = train_incremental_model(args.data, chunksize=args.chunksize,
+                                             forgetting_factor=args.forgetting_factor)
+    else:
+        model_path = run_stage(
+            cache, 'train', lambda: stage_result(train(), model_artifacts),
+            params=dict(params, mode=args.mode), inputs=inputs,
+            code=[train_batch_model, train_streaming_model, train_parallel_model, train_cv_model,
+                  save_model, 'streaming_ols', 'parallel_training', 'cross_validation',
+                  'columnar_store', 'streaming_metrics', 'incremental_model', 'model_export'])
+        make_current(model_path)
     
-    # Step 3: Make predictions
-    predictions = make_predictions(model_path)
+    # Step 3: Plot permutation feature importance on the rows the model was evaluated on
+    if args.mode == 'parallel':
+        shards = find_shards(args.shards or args.data)
+    else:
+        shards = find_shards(args.shards) if args.mode == 'cv' and args.shards else None
+    run_stage(cache, 'plot',
+              lambda: stage_result(plot_model(model_path, args.mode, args.data, shards), 'plot'),
+              params={'mode': args.mode}, inputs=[model_path, shards or args.data],
+              code=[plot_model, evaluation_rows, plot_feature_importance, 'permutation_importance',
+                    'parallel_training'])
+    
+    # Step 4: Make predictions
+    if args.score_input:
+        run_stage(cache, 'score',
+                  lambda: stage_result(score_listings(model_path, args.score_input), 'predictions'),
+                  inputs=[model_path, args.score_input], code=[score_listings, 'batch_scoring'])
+    else:
+        run_stage(cache, 'predict',
+                  lambda: stage_result(make_predictions(model_path), 'predictions'),
+                  inputs=[model_path], code=[make_predictions])
+    
+    # Keep the cache bounded; the current model and the training data are never evicted
+    if cache is not None:
+        evicted = evict_stale(cache, args.cache_max_mb * 2**20, args.cache_max_age_days,
+                              protect=[args.data, *model_artifacts(model_path).values()])
+        if evicted:
+            print(f"\nEvicted {len(evicted)} stale cache entr{'y' if len(evicted) == 1 else 'ies'}")
     
     print("\n=== Batch Processing Complete ===")
     print("Model trained and predictions made successfully!")
+    
+    if args.trace:
+        tracer.write_json(args.trace)
+        print(f"\n=== Stage Trace ({args.trace}) ===")
+        print(tracer.summary())
@@ -0,0 +1,194 @@
+"""
+Columnar Binary Storage
+-----------------------
+A typed, column-per-file binary layout for the house price dataset:
+
+    data/house_prices.cols/
+        meta.json          row count, column order and dtypes
+        size_sqft.npy      int16
+        bedrooms.npy       int8
+        age_years.npy      int8
+        price.npy          float64
+
+Each column is stored in the smallest dtype that holds its values, so the
+integer columns take 1-2 bytes instead of 8. Columns are opened with
+np.load(mmap_mode='r'), so loading is zero-copy and pages are read on demand.
+
+    python columnar_store.py data/house_prices.csv              # convert
+    python columnar_store.py --benchmark --rows 1e6 1e7         # vs pd.read_csv
+"""
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+META_NAME = 'meta.json'
+_INT_DTYPES = [np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32, np.int64]
+
+
+def is_columnar(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_NAME))
+
+
+def default_output_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '.cols'
+
+
+def smallest_int_dtype(low, high):
+    for dtype in _INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def convert_csv(csv_path, output_path=None, chunksize=1_000_000):
+    """Convert a CSV to the columnar layout in two streaming passes.
+
+    The first pass finds each column's range to pick a compact dtype; the
+    second writes the values into pre-sized memory-mapped .npy files.
+    """
+    output_path = output_path or default_output_path(csv_path)
+    n_rows = 0
+    columns = None
+    low = high = integral = None
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        if columns is None:
+            columns = list(chunk.columns)
+            low = {c: np.inf for c in columns}
+            high = {c: -np.inf for c in columns}
+            integral = {c: True for c in columns}
+        for c in columns:
+            values = chunk[c].to_numpy()
+            low[c] = min(low[c], values.min())
+            high[c] = max(high[c], values.max())
+            integral[c] = integral[c] and np.issubdtype(values.dtype, np.integer)
+        n_rows += len(chunk)
+    if columns is None:
+        raise ValueError(f"{csv_path} has no rows")
+
+    dtypes = {c: smallest_int_dtype(low[c], high[c]) if integral[c] else np.dtype(np.float64)
+              for c in columns}
+    os.makedirs(output_path, exist_ok=True)
+    arrays = {c: np.lib.format.open_memmap(os.path.join(output_path, f'{c}.npy'), mode='w+',
+                                           dtype=dtypes[c], shape=(n_rows,))
+              for c in columns}
+    start = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        for c in columns:
+            arrays[c][start:start + len(chunk)] = chunk[c].to_numpy()
+        start += len(chunk)
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+    meta = {'rows': n_rows,
+            'columns': [{'name': c, 'dtype': dtypes[c].str} for c in columns]}
+    with open(os.path.join(output_path, META_NAME), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return output_path
+
+
+def load_columns(path, columns=None):
+    """Memory-map the requested columns; nothing is read until it is used."""
+    with open(os.path.join(path, META_NAME)) as f:
+        meta = json.load(f)
+    names = columns or [c['name'] for c in meta['columns']]
+    return {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+            for name in names}
+
+
+def read_table(path):
+    """DataFrame from either a CSV file or a columnar directory.
+
+    A columnar table wraps the memory-mapped columns without copying them,
+    so it is read-only: copy it (or the columns you change) before writing.
+    """
+    if is_columnar(path):
+        return pd.DataFrame(load_columns(path), copy=False)
+    return pd.read_csv(path)
+
+
+def iter_columnar_chunks(path, columns, chunksize=1_000_000):
+    """Yield (start_row, float64 array) pairs, like streaming_ols.iter_csv_chunks."""
+    arrays = load_columns(path, columns)
+    n_rows = len(arrays[columns[0]])
+    for start in range(0, n_rows, chunksize):
+        stop = min(start + chunksize, n_rows)
+        block = np.empty((stop - start, len(columns)), dtype=np.float64)
+        for j, name in enumerate(columns):
+            block[:, j] = arrays[name][start:stop]
+        yield start, block
+
+
+def resident_mb():
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(kind, path, queue):
+    """Child process: load a table and scan every column; report time and RSS growth."""
+    base = resident_mb()
+    t0 = time.perf_counter()
+    if kind == 'csv':
+        table = pd.read_csv(path)
+        loaded = time.perf_counter() - t0
+        totals = [table[c].to_numpy().sum() for c in table.columns]
+    else:
+        table = load_columns(path)
+        loaded = time.perf_counter() - t0
+        totals = [np.add.reduce(a, dtype=np.float64) for a in table.values()]
+    scanned = time.perf_counter() - t0
+    queue.put((loaded, scanned, resident_mb() - base, len(totals)))
+
+
+def benchmark(sizes=(1e6, 1e7)):
+    """Load time and resident memory: pd.read_csv vs the columnar store."""
+    from data_generator import write_dataset
+
+    ctx = get_context('spawn')
+    print(f"{'Rows':>12} {'Format':<9} {'Load s':>8} {'Scan s':>8} {'RSS MB':>9} {'Disk MB':>9}")
+    print("-" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            n_rows = int(size)
+            csv_path = os.path.join(tmp, f'house_prices_{n_rows}.csv')
+            write_dataset(csv_path, n_rows)
+            cols_path = convert_csv(csv_path)
+            disk = {'csv': os.path.getsize(csv_path),
+                    'columnar': sum(os.path.getsize(os.path.join(cols_path, f))
+                                    for f in os.listdir(cols_path))}
+            for kind, path in (('csv', csv_path), ('columnar', cols_path)):
+                queue = ctx.Queue()
+                proc = ctx.Process(target=_measure, args=(kind, path, queue))
+                proc.start()
+                loaded, scanned, peak_mb, _ = queue.get()
+                proc.join()
+                print(f"{n_rows:>12,} {kind:<9} {loaded:8.3f} {scanned:8.3f} "
+                      f"{peak_mb:9.1f} {disk[kind] / 2**20:9.1f}")
+            os.remove(csv_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert house price CSVs to columnar binary")
+    parser.add_argument('csv_path', nargs='?', default='data/house_prices.csv')
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--benchmark', action='store_true')
+    parser.add_argument('--rows', type=float, nargs='+', default=[1e6, 1e7])
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.rows)
+    else:
+        output = convert_csv(args.csv_path, args.output)
+        print(f"Converted {args.csv_path} to {output}")
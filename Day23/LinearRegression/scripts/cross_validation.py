@@ -0,0 +1,163 @@
+"""
+K-Fold Cross-Validation from Sufficient Statistics
+--------------------------------------------------
+k-fold CV for the house price model at the cost of one data pass. Every
+row is assigned to a fold by hashing its global row number (the same
+splitmix64 keys as the streaming hold-out split), and the pass reduces each
+fold to streaming_ols.SufficientStats. The training statistics of fold i
+are then the total minus fold i (SufficientStats.subtract), so fitting and
+scoring all k folds is k small d×d solves instead of k refits over the
+data.
+
+The pass itself can run over CSV shards in a process pool, using the
+byte-range work units of parallel_training.
+
+    python cross_validation.py --rows 1000000 --folds 10
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from parallel_training import BLOCK_BYTES, iter_range_chunks, plan_byte_ranges, tree_reduce
+from streaming_ols import (FEATURE_COLUMNS, TARGET_COLUMN, SufficientStats, row_uniforms,
+                           solve_ols, evaluate)
+
+
+def fold_ids(start, n_rows, n_folds=10, seed=42):
+    """Fold number of rows [start, start + n_rows), independent of chunking."""
+    keys = row_uniforms(np.arange(start, start + n_rows), seed)
+    return (keys * n_folds).astype(np.int64)
+
+
+def _split_folds(folds, block, ids):
+    for k, stats in enumerate(folds):
+        stats.update(block[ids == k])
+
+
+def fold_statistics(chunks, n_folds=10, seed=42):
+    """One pass over (start_row, block) chunks into per-fold statistics."""
+    folds = None
+    for start, block in chunks:
+        if folds is None:
+            folds = [SufficientStats(block.shape[1]) for _ in range(n_folds)]
+        _split_folds(folds, block, fold_ids(start, len(block), n_folds, seed))
+    if folds is None:
+        raise ValueError("no rows to cross-validate")
+    return folds
+
+
+def range_fold_statistics(unit, n_folds=10, seed=42, chunksize=100_000):
+    """Worker: reduce one byte range of a CSV shard to per-fold statistics."""
+    columns = FEATURE_COLUMNS + [TARGET_COLUMN]
+    folds = [SufficientStats(len(columns)) for _ in range(n_folds)]
+    # Keyed on (block, local row) like parallel_training's hold-out split
+    for offset, block in iter_range_chunks(unit, columns, chunksize):
+        _split_folds(folds, block, fold_ids(offset, len(block), n_folds, seed))
+    return folds
+
+
+def _range_fold_statistics_star(args):
+    return range_fold_statistics(*args)
+
+
+def parallel_fold_statistics(paths, n_folds=10, workers=None, block_bytes=BLOCK_BYTES, seed=42):
+    """Per-fold statistics of all shards, reduced in a fixed order for any pool size."""
+    args = [(unit, n_folds, seed) for unit in plan_byte_ranges(paths, block_bytes)]
+    if workers == 1:
+        results = [range_fold_statistics(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_range_fold_statistics_star, args))
+    return [tree_reduce([r[k] for r in results]) for k in range(n_folds)]
+
+
+def score_fold(total, fold):
+    """Fit on everything but ``fold`` and score on ``fold``."""
+    train = total.copy().subtract(fold)
+    coef, intercept = solve_ols(train)
+    mse, r2 = evaluate(fold, coef, intercept)
+    return {'mse': mse, 'r2': r2, 'train_rows': int(train.count),
+            'test_rows': int(fold.count), 'coef': coef, 'intercept': float(intercept)}
+
+
+def cross_validate(folds, workers=None):
+    """Score every fold from its statistics; returns (per-fold results, summary).
+
+    Each fold is a d×d solve, so the folds run in a thread pool (NumPy's
+    solver releases the GIL) rather than paying for extra processes.
+    """
+    total = tree_reduce(folds)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda fold: score_fold(total, fold), folds))
+    mse = np.array([r['mse'] for r in results])
+    r2 = np.array([r['r2'] for r in results])
+    rows = np.array([r['test_rows'] for r in results])
+    summary = {'folds': len(results), 'mse_mean': float(mse.mean()), 'mse_std': float(mse.std()),
+               'r2_mean': float(r2.mean()), 'r2_std': float(r2.std()),
+               'mse_pooled': float(mse @ rows / rows.sum())}
+    return results, summary
+
+
+def print_report(results, summary):
+    print(f"{'Fold':>4} {'Train rows':>12} {'Test rows':>10} {'MSE':>16} {'R²':>8}")
+    print("-" * 54)
+    for k, r in enumerate(results):
+        print(f"{k:>4} {r['train_rows']:>12,} {r['test_rows']:>10,} {r['mse']:>16,.2f} {r['r2']:>8.4f}")
+    print("-" * 54)
+    print(f"MSE {summary['mse_mean']:,.2f} ± {summary['mse_std']:,.2f} "
+          f"(pooled {summary['mse_pooled']:,.2f}), "
+          f"R² {summary['r2_mean']:.4f} ± {summary['r2_std']:.4f}")
+
+
+def benchmark(n_rows=1_000_000, n_folds=10, chunksize=100_000):
+    """Wall time of sklearn's k refits vs one pass, against a single fit."""
+    from sklearn.linear_model import LinearRegression
+    from sklearn.model_selection import KFold, cross_validate as sklearn_cv
+
+    from data_generator import write_dataset
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'house_prices.csv')
+        write_dataset(path, n_rows)
+        data = pd.read_csv(path)
+    X, y = data[FEATURE_COLUMNS].to_numpy(), data[TARGET_COLUMN].to_numpy()
+    block = np.column_stack([X, y])
+
+    t0 = time.perf_counter()
+    LinearRegression().fit(X, y)
+    single = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    sklearn_cv(LinearRegression(), X, y, cv=KFold(n_folds, shuffle=True, random_state=42),
+               scoring='neg_mean_squared_error')
+    refits = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    chunks = ((s, block[s:s + chunksize]) for s in range(0, n_rows, chunksize))
+    results, _ = cross_validate(fold_statistics(chunks, n_folds))
+    one_pass = time.perf_counter() - t0
+
+    # Same numbers as refitting on the same folds
+    ids = fold_ids(0, n_rows, n_folds)
+    model = LinearRegression().fit(X[ids != 0], y[ids != 0])
+    expected = np.mean((model.predict(X[ids == 0]) - y[ids == 0]) ** 2)
+
+    print(f"{n_rows:,} rows, {n_folds} folds")
+    print(f"  single LinearRegression fit:   {single:7.3f} s")
+    print(f"  sklearn cross_validate:        {refits:7.3f} s")
+    print(f"  one-pass fold statistics:      {one_pass:7.3f} s")
+    print(f"  fold 0 MSE vs refit: relative difference "
+          f"{abs(results[0]['mse'] - expected) / expected:.1e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark one-pass k-fold cross-validation")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--folds', type=int, default=10)
+    args = parser.parse_args()
+    benchmark(args.rows, args.folds)
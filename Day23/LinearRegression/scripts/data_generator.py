@@ -0,0 +1,95 @@
+"""
+Parallel Synthetic House Data Generator
+---------------------------------------
+Large-scale version of generate_sample_data for load tests. Rows are
+produced in fixed blocks, and every block draws from its own child seed
+sequence (SeedSequence(seed, spawn_key=(block,))). Row i therefore has
+the same values whatever chunk size or worker count wrote it. Chunks are
+generated and formatted as CSV in worker processes and streamed to disk in
+order, with only a bounded number of chunks in flight.
+
+    python data_generator.py --rows 100000000 --workers 8 --output data/house_prices.csv
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+BLOCK_ROWS = 1 << 16
+COLUMNS = ['size_sqft', 'bedrooms', 'age_years', 'price']
+
+
+def generate_block(block, seed=42, n_rows=BLOCK_ROWS):
+    """Generate one block of houses from its own independent RNG stream."""
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(block,)))
+    size = rng.normal(1500, 500, n_rows).astype(np.int64)
+    bedrooms = rng.integers(1, 6, n_rows)
+    age = rng.integers(0, 50, n_rows)
+    price = 50000 + 200 * size + 30000 * bedrooms - 1000 * age + rng.normal(0, 10000, n_rows)
+    return pd.DataFrame({'size_sqft': size, 'bedrooms': bedrooms,
+                         'age_years': age, 'price': price})
+
+
+def generate_rows(start, stop, seed=42):
+    """Rows [start, stop) of the dataset, independent of how the range is split."""
+    first, last = start // BLOCK_ROWS, (stop - 1) // BLOCK_ROWS
+    frames = [generate_block(b, seed) for b in range(first, last + 1)]
+    data = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    offset = start - first * BLOCK_ROWS
+    return data.iloc[offset:offset + (stop - start)].reset_index(drop=True)
+
+
+def format_chunk(start, stop, seed=42, float_format=None):
+    """Worker: generate a row range and return it as CSV bytes (no header)."""
+    data = generate_rows(start, stop, seed)
+    return data.to_csv(index=False, header=False, float_format=float_format).encode()
+
+
+def write_dataset(path, n_rows, seed=42, chunk_rows=1_000_000, workers=None,
+                  float_format=None):
+    """Stream ``n_rows`` synthetic houses to a CSV file; returns rows per second."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    starts = range(0, n_rows, chunk_rows)
+    workers = workers or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    with open(path, 'wb', buffering=1 << 20) as f:
+        f.write((','.join(COLUMNS) + '\n').encode())
+        if workers == 1:
+            for start in starts:
+                f.write(format_chunk(start, min(start + chunk_rows, n_rows), seed, float_format))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # Keep a bounded window of chunks in flight and write them in order
+                window = 2 * workers
+                pending = deque()
+                for start in starts:
+                    pending.append(pool.submit(format_chunk, start,
+                                               min(start + chunk_rows, n_rows),
+                                               seed, float_format))
+                    if len(pending) >= window:
+                        f.write(pending.popleft().result())
+                while pending:
+                    f.write(pending.popleft().result())
+    elapsed = time.perf_counter() - t0
+    return n_rows / elapsed if elapsed > 0 else float('inf')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a large synthetic house price CSV")
+    parser.add_argument('--rows', type=float, default=1e6)
+    parser.add_argument('--output', default='data/house_prices.csv')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--float-format', default=None,
+                        help="e.g. '%%.2f' to write shorter prices faster")
+    args = parser.parse_args()
+
+    n_rows = int(args.rows)
+    rate = write_dataset(args.output, n_rows, args.seed, args.chunk_rows,
+                         args.workers, args.float_format)
+    print(f"Generated {n_rows:,} samples in {args.output} ({rate:,.0f} rows/sec)")
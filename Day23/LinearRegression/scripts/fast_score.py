@@ -0,0 +1,147 @@
+"""
+NumPy-Only Scoring Entry Point
+------------------------------
+Scores houses with an exported model (model_export.py) without importing
+pandas, scikit-learn, joblib or matplotlib, so a short-lived scoring job
+starts in the time it takes to import NumPy instead of the whole training
+stack.
+
+    python fast_score.py models/house_price_model_<ts>.linear.json listings.csv scores.csv
+    python fast_score.py models/house_price_model_<ts>.linear.json --features 1200 2 5
+    python fast_score.py --cold-start          # startup time vs the joblib/pandas path
+
+The output file has the same layout as batch_scoring.score_file (a
+predicted_price header, then one exact repr per row), and the predictions
+are bit-identical for the same model.
+"""
+import argparse
+import itertools
+import sys
+import time
+
+import numpy as np
+
+from model_export import load_exported
+
+
+def feature_indices(header, feature_names):
+    """Positions of the model's features in a CSV header line."""
+    columns = [name.strip().strip('"') for name in header.rstrip('\r\n').split(',')]
+    missing = [name for name in feature_names if name not in columns]
+    if missing:
+        raise ValueError(f"missing feature column(s): {', '.join(missing)}")
+    return [columns.index(name) for name in feature_names]
+
+
+def iter_csv_blocks(input_path, feature_names, chunksize=200_000):
+    """Yield float64 feature matrices from a CSV, columns in model order."""
+    with open(input_path) as f:
+        usecols = feature_indices(f.readline(), feature_names)
+        while True:
+            lines = list(itertools.islice(f, chunksize))
+            if not lines:
+                return
+            # usecols keeps the model's order, whatever the file's order
+            yield np.loadtxt(lines, delimiter=',', usecols=usecols, dtype=np.float64, ndmin=2)
+
+
+def score_csv(export_path, input_path, output_path, chunksize=200_000,
+              buffer_bytes=8 * 1024 * 1024):
+    """Score every row of ``input_path``; returns (rows scored, rows per second)."""
+    scorer = load_exported(export_path)
+    n_rows = 0
+    t0 = time.perf_counter()
+    with open(output_path, 'w', buffering=buffer_bytes) as out:
+        out.write('predicted_price\n')
+        for block in iter_csv_blocks(input_path, scorer.feature_names, chunksize):
+            predictions = scorer.predict(block)
+            out.write('\n'.join(map(repr, predictions.tolist())))
+            out.write('\n')
+            n_rows += len(predictions)
+    elapsed = time.perf_counter() - t0
+    rate = n_rows / elapsed if elapsed > 0 else float('inf')
+    return n_rows, rate
+
+
+def _best_of(command, repeat, env):
+    import subprocess
+
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(command, env=env, check=True, capture_output=True)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def cold_start_benchmark(n_rows=1000, repeat=5):
+    """Wall time of fresh processes: joblib + pandas scoring vs this entry point."""
+    import os
+    import tempfile
+
+    import joblib
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    from data_generator import write_dataset
+    from model_export import export_model
+    from streaming_ols import FEATURE_COLUMNS, TARGET_COLUMN
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [here, os.environ.get('PYTHONPATH')])),
+               MPLBACKEND='Agg')
+    python = sys.executable
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = os.path.join(tmp, 'house_prices.csv')
+        write_dataset(data_path, n_rows, workers=1)
+        data = pd.read_csv(data_path)
+        model = LinearRegression().fit(data[FEATURE_COLUMNS], data[TARGET_COLUMN])
+        model_path = os.path.join(tmp, 'house_price_model.joblib')
+        joblib.dump(model, model_path)
+        export_path = export_model(model, model_path=model_path)
+        old_out, new_out = os.path.join(tmp, 'old.csv'), os.path.join(tmp, 'new.csv')
+
+        runs = [
+            ("python -c 'import numpy'", [python, '-c', 'import numpy']),
+            ("import batch_ml_example", [python, '-c', 'import batch_ml_example']),
+            ("batch_scoring.py (joblib)", [python, os.path.join(here, 'batch_scoring.py'),
+                                           model_path, data_path, old_out]),
+            ("fast_score.py (export)", [python, os.path.join(here, 'fast_score.py'),
+                                        export_path, data_path, new_out]),
+            ("fast_score.py --features", [python, os.path.join(here, 'fast_score.py'),
+                                          export_path, '--features', '1200', '2', '5']),
+        ]
+        print(f"Cold start, best of {repeat} fresh processes ({n_rows:,}-row CSV)")
+        for label, command in runs:
+            print(f"  {label:<28} {_best_of(command, repeat, env):7.3f} s")
+
+        with open(old_out) as f_old, open(new_out) as f_new:
+            identical = f_old.read() == f_new.read()
+        print(f"  scores identical to batch_scoring: {identical}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score houses with an exported linear model")
+    parser.add_argument('export_path', nargs='?', help="a .linear.json model export")
+    parser.add_argument('input_path', nargs='?', help="CSV of houses to score")
+    parser.add_argument('output_path', nargs='?', help="where to write the predictions")
+    parser.add_argument('--features', nargs='+', type=float, default=None,
+                        help="score one house given its feature values in model order")
+    parser.add_argument('--chunksize', type=int, default=200_000)
+    parser.add_argument('--cold-start', action='store_true',
+                        help="measure process startup against the joblib/pandas path")
+    parser.add_argument('--rows', type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.cold_start:
+        cold_start_benchmark(args.rows)
+    elif args.export_path and args.features:
+        scorer = load_exported(args.export_path)
+        print(repr(float(scorer.predict([args.features])[0])))
+    elif args.export_path and args.input_path and args.output_path:
+        n_rows, rate = score_csv(args.export_path, args.input_path, args.output_path,
+                                 args.chunksize)
+        print(f"Scored {n_rows:,} rows into {args.output_path} ({rate:,.0f} rows/sec)")
+    else:
+        parser.error("give EXPORT_PATH INPUT_PATH OUTPUT_PATH, EXPORT_PATH --features ..., "
+                     "or --cold-start")
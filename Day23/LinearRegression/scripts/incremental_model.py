@@ -0,0 +1,105 @@
+"""
+Incremental House Price Model
+-----------------------------
+A partial_fit-style linear model for nightly updates. Instead of refitting
+LinearRegression on the whole history, the model keeps the sufficient
+statistics of everything it has seen (see streaming_ols.SufficientStats).
+Folding in a batch of b rows costs O(b·d²), and re-solving the d×d normal
+equations is negligible for our handful of features. Without forgetting,
+the solution equals a full refit on all rows up to floating-point rounding.
+
+An optional forgetting factor λ < 1 down-weights older sales
+exponentially (each row's weight shrinks by λ for every newer row), like
+recursive least squares with forgetting.
+
+The state is saved next to the joblib artifact, e.g.
+models/house_price_model_<timestamp>.state.npz, so a nightly job only
+needs to read the delta.
+"""
+import json
+import os
+
+import numpy as np
+
+from streaming_ols import FEATURE_COLUMNS, SufficientStats, solve_ols, to_linear_regression
+
+
+def state_path_for(model_path):
+    """State file that sits next to a model artifact."""
+    return os.path.splitext(model_path)[0] + '.state.npz'
+
+
+class IncrementalLinearModel:
+    """Linear regression updated in place from batches of new rows."""
+
+    def __init__(self, feature_names=None, forgetting_factor=1.0):
+        self.feature_names = list(feature_names or FEATURE_COLUMNS)
+        self.forgetting_factor = forgetting_factor
+        self.stats = SufficientStats(len(self.feature_names) + 1)
+        self.coef_ = np.zeros(len(self.feature_names))
+        self.intercept_ = 0.0
+
+    @property
+    def forgetting_factor(self):
+        return self._forgetting_factor
+
+    @forgetting_factor.setter
+    def forgetting_factor(self, value):
+        if not 0.0 < value <= 1.0:
+            raise ValueError("forgetting_factor must be in (0, 1]")
+        self._forgetting_factor = value
+
+    @classmethod
+    def from_stats(cls, stats, feature_names=None, forgetting_factor=1.0):
+        """Start from statistics already computed by a streaming/parallel fit."""
+        model = cls(feature_names, forgetting_factor)
+        model.stats = stats.copy()
+        model._solve()
+        return model
+
+    def partial_fit(self, X, y):
+        """Fold a batch of rows into the model and refresh the coefficients."""
+        block = np.column_stack([np.asarray(X, dtype=np.float64),
+                                 np.asarray(y, dtype=np.float64)])
+        if not len(block):
+            return self
+        lam = self.forgetting_factor
+        if lam < 1.0:
+            n = len(block)
+            self.stats.scale(lam ** n)
+            weights = lam ** np.arange(n - 1, -1, -1, dtype=np.float64)
+            self.stats.merge(SufficientStats.from_array(block, weights))
+        else:
+            self.stats.update(block)
+        self._solve()
+        return self
+
+    def _solve(self):
+        if self.stats.count > 0:
+            self.coef_, self.intercept_ = solve_ols(self.stats)
+            self.intercept_ = float(self.intercept_)
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+    def to_linear_regression(self):
+        return to_linear_regression(self.coef_, self.intercept_, self.feature_names)
+
+    # -- persistence ---------------------------------------------------
+
+    def save_state(self, path):
+        np.savez(path, count=np.float64(self.stats.count), mean=self.stats.mean,
+                 comoment=self.stats.comoment,
+                 meta=np.array(json.dumps({'feature_names': self.feature_names,
+                                           'forgetting_factor': self.forgetting_factor})))
+        return path
+
+    @classmethod
+    def load_state(cls, path):
+        with np.load(path) as state:
+            meta = json.loads(str(state['meta']))
+            stats = SufficientStats(len(state['mean']))
+            stats.count = float(state['count'])
+            stats.mean = state['mean']
+            stats.comoment = state['comoment']
+        return cls.from_stats(stats, meta['feature_names'], meta['forgetting_factor'])
@@ -0,0 +1,100 @@
+"""
+Lightweight Model Export
+------------------------
+A trained LinearRegression is just coefficients, an intercept and the
+feature order, so scoring it should not need scikit-learn, joblib or
+pandas. export_model writes those to a small self-describing JSON file
+next to the joblib artifact:
+
+    models/house_price_model_<timestamp>.linear.json
+    {"format": "linear-model", "version": 1, "dtype": "float64",
+     "feature_names": ["size_sqft", "bedrooms", "age_years"],
+     "coef": [...], "intercept": ...}
+
+Floats are written with repr, which round-trips float64 exactly, so a
+LinearScorer loaded from the file gives bit-identical predictions to
+model.predict. This module imports only NumPy and the standard library.
+"""
+import json
+import os
+
+import numpy as np
+
+FORMAT_NAME = 'linear-model'
+FORMAT_VERSION = 1
+EXPORT_SUFFIX = '.linear.json'
+
+
+def export_path_for(model_path):
+    """models/house_price_model_<ts>.joblib -> models/house_price_model_<ts>.linear.json"""
+    return os.path.splitext(model_path)[0] + EXPORT_SUFFIX
+
+
+def is_exported(path):
+    return str(path).endswith(EXPORT_SUFFIX)
+
+
+class LinearScorer:
+    """Exported linear model: X @ coef + intercept, nothing else."""
+
+    def __init__(self, coef, intercept, feature_names, dtype='float64'):
+        self.dtype = np.dtype(dtype)
+        self.coef = np.ascontiguousarray(coef, dtype=self.dtype)
+        self.intercept = self.dtype.type(intercept)
+        self.feature_names = list(feature_names)
+        if len(self.coef) != len(self.feature_names):
+            raise ValueError(f"{len(self.coef)} coefficients for "
+                             f"{len(self.feature_names)} feature names")
+
+    def predict(self, X):
+        """Score an (n, d) matrix with columns in feature_names order."""
+        X = np.ascontiguousarray(X, dtype=self.dtype)
+        return X @ self.coef + self.intercept
+
+    def to_dict(self):
+        return {'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'dtype': self.dtype.name,
+                'feature_names': self.feature_names,
+                'coef': [float(c) for c in self.coef], 'intercept': float(self.intercept)}
+
+    def save(self, path):
+        # Python's json writes floats with repr, so every bit survives
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            spec = json.load(f)
+        if spec.get('format') != FORMAT_NAME:
+            raise ValueError(f"{path} is not a {FORMAT_NAME} export")
+        if spec.get('version', 0) > FORMAT_VERSION:
+            raise ValueError(f"{path} has format version {spec['version']}; "
+                             f"this reader supports up to {FORMAT_VERSION}")
+        return cls(spec['coef'], spec['intercept'], spec['feature_names'],
+                   spec.get('dtype', 'float64'))
+
+
+def export_model(model, feature_names=None, path=None, model_path=None):
+    """Write a fitted linear model's parameters; returns the export path.
+
+    Works with anything exposing coef_ and intercept_ (LinearRegression,
+    the streaming and incremental solutions), without importing sklearn.
+    """
+    if feature_names is None:
+        feature_names = getattr(model, 'feature_names_in_', None)
+    if feature_names is None:
+        raise ValueError("feature_names are required for a model fitted without them")
+    if path is None:
+        if model_path is None:
+            raise ValueError("pass the export path or the model artifact path")
+        path = export_path_for(model_path)
+    scorer = LinearScorer(np.ravel(model.coef_), np.ravel(model.intercept_)[0],
+                          [str(name) for name in feature_names])
+    return scorer.save(path)
+
+
+def load_exported(path):
+    return LinearScorer.load(path)
@@ -0,0 +1,230 @@
+"""
+Model Registry
+--------------
+Indexes the timestamped models/house_price_model_*.joblib artifacts in a
+small JSON file (models/registry.json) together with their metrics and a
+digest of the training data (memoized on file size and mtime), so consumers can ask for the "latest" or "best"
+model without globbing the directory.
+
+Loaded models are kept in a size-bounded LRU cache. The index is rewritten
+atomically (write to a temp file, then os.replace), and long-running
+consumers call current() to pick up a newly promoted model without
+restarting.
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+
+INDEX_NAME = 'registry.json'
+_TIMESTAMP = re.compile(r'house_price_model_(\d{8}_\d{6})\.joblib$')
+
+
+def file_hash(paths, block_size=1 << 20):
+    """Content hash of one file (or several, in order), read in blocks.
+
+    A directory, such as a columnar dataset, hashes its files in name order.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    expanded = []
+    for path in paths:
+        if os.path.isdir(path):
+            expanded.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+        else:
+            expanded.append(path)
+    paths = expanded
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+# path -> {'size', 'mtime_ns', 'hash'} for every file digested in this process
+_digests = {}
+
+
+def file_digest(paths, memo=None):
+    """Content digest of files or directories, without rereading unchanged files.
+
+    A file is only rehashed when its size or mtime changed since it was
+    last hashed in this process or recorded in ``memo`` (a dict persisted
+    by the caller, e.g. the pipeline cache index), so checking a large
+    training file that was already hashed costs one stat call.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    memo = {} if memo is None else memo
+    parts = []
+    for path in paths:
+        files = ([os.path.join(path, name) for name in sorted(os.listdir(path))]
+                 if os.path.isdir(path) else [path])
+        for name in files:
+            st = os.stat(name)
+            for known in (memo.get(name), _digests.get(name)):
+                if known and known['size'] == st.st_size and known['mtime_ns'] == st.st_mtime_ns:
+                    break
+            else:
+                known = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'hash': file_hash(name)}
+            memo[name] = _digests[name] = known
+            parts.append(known['hash'])
+    return hashlib.blake2b(''.join(parts).encode(), digest_size=16).hexdigest()
+
+
+class ModelRegistry:
+    """JSON-indexed model artifacts with an LRU cache of loaded models."""
+
+    def __init__(self, root='models', cache_size=4):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_mtime = None
+
+    # -- index ---------------------------------------------------------
+
+    def _read_index(self):
+        """Reload the index only when the file has changed on disk."""
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except FileNotFoundError:
+            return {'models': [], 'current': None}
+        if mtime != self._index_mtime:
+            with open(self.index_path) as f:
+                self._index = json.load(f)
+            self._index_mtime = mtime
+        return self._index
+
+    def _write_index(self, index):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+        self._index = index
+        self._index_mtime = os.stat(self.index_path).st_mtime_ns
+
+    def entries(self):
+        return list(self._read_index()['models'])
+
+    def register(self, model_path, metrics=None, data_path=None, promote=True, data_hash=None):
+        """Add an artifact to the index and (by default) make it current.
+
+        ``data_hash`` is a file_digest of ``data_path`` if the caller already
+        has one; otherwise it is computed, rereading the data only when it
+        changed since it was last digested.
+        """
+        match = _TIMESTAMP.search(os.path.basename(model_path))
+        timestamp = match.group(1) if match else datetime.now().strftime('%Y%m%d_%H%M%S')
+        with self._lock:
+            index = dict(self._read_index())
+            if data_hash is None and data_path:
+                index['digests'] = dict(index.get('digests', {}))
+                data_hash = file_digest(data_path, index['digests'])
+            entry = {
+                'path': model_path,
+                'timestamp': timestamp,
+                'metrics': metrics or {},
+                'data_hash': data_hash,
+            }
+            models = [m for m in index['models'] if m['path'] != model_path]
+            models.append(entry)
+            models.sort(key=lambda m: m['timestamp'])
+            index['models'] = models
+            if promote:
+                index['current'] = model_path
+            self._write_index(index)
+        return entry
+
+    def remove(self, model_path):
+        """Drop an artifact from the index, e.g. after it was deleted from disk."""
+        with self._lock:
+            index = dict(self._read_index())
+            index['models'] = [m for m in index['models'] if m['path'] != model_path]
+            if index.get('current') == model_path:
+                index['current'] = index['models'][-1]['path'] if index['models'] else None
+            self._write_index(index)
+            self._cache.pop(model_path, None)
+
+    def scan(self):
+        """Index any artifacts in the directory that are not registered yet."""
+        known = {m['path'] for m in self.entries()}
+        pattern = os.path.join(self.root, 'house_price_model_*.joblib')
+        for path in sorted(glob.glob(pattern)):
+            if path not in known:
+                self.register(path, promote=False)
+        return self.entries()
+
+    def resolve(self, selector='current'):
+        """Entry for 'current', 'latest', 'best' (lowest MSE) or an exact path."""
+        index = self._read_index()
+        models = index['models']
+        if not models:
+            raise LookupError(f"No models registered in {self.index_path}")
+        if selector == 'current':
+            selector = index.get('current') or 'latest'
+        if selector == 'latest':
+            return models[-1]
+        if selector == 'best':
+            scored = [m for m in models if 'mse' in m['metrics']]
+            if not scored:
+                raise LookupError("No registered model has an MSE to rank by")
+            return min(scored, key=lambda m: m['metrics']['mse'])
+        for m in models:
+            if m['path'] == selector:
+                return m
+        raise LookupError(f"{selector} is not registered")
+
+    def promote(self, selector):
+        """Make another registered model the current one (hot-swap)."""
+        entry = self.resolve(selector)
+        with self._lock:
+            index = dict(self._read_index())
+            index['current'] = entry['path']
+            self._write_index(index)
+        return entry
+
+    # -- loading -------------------------------------------------------
+
+    def load(self, selector='current'):
+        """Return (entry, model), loading from disk only on a cache miss."""
+        entry = self.resolve(selector)
+        path = entry['path']
+        with self._lock:
+            if path in self._cache:
+                self._cache.move_to_end(path)
+                return entry, self._cache[path]
+        import joblib
+
+        model = joblib.load(path)
+        with self._lock:
+            self._cache[path] = model
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry, model
+
+    def current(self):
+        """The current model; picks up a new promotion on the next call."""
+        return self.load('current')
+
+
+if __name__ == "__main__":
+    registry = ModelRegistry()
+    entries = registry.scan()
+    print(f"{len(entries)} model(s) registered in {registry.index_path}")
+    for entry in entries:
+        metrics = ', '.join(f"{k}={v:.4g}" for k, v in entry['metrics'].items())
+        print(f"  {entry['timestamp']}  {entry['path']}  {metrics}")
+    if entries:
+        print(f"current: {registry.resolve('current')['path']}")
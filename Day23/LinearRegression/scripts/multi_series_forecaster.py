@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Vectorized Multi-Series Online Forecaster
+-----------------------------------------
+The exponential moving average from online_temperature_prediction.py,
+generalised to N sensors at once. The state of every series lives in
+contiguous NumPy arrays, and each timestamp is one vectorized in-place
+update over all series, with no Python loop per sensor.
+
+Two methods are supported:
+  * 'ema'           - the original smoother: next = α·actual + (1-α)·previous
+  * 'holt_winters'  - additive level + trend + seasonality (the weekly
+                      pattern generate_temperature_data simulates)
+
+Run directly to benchmark against the scalar per-series loop:
+
+    python multi_series_forecaster.py --series 50000 --steps 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+
+class VectorizedForecaster:
+    """One-step-ahead forecaster holding the state of N series in arrays."""
+
+    def __init__(self, n_series, method='ema', alpha=0.3, beta=0.05, gamma=0.2,
+                 season_length=7, dtype=np.float64):
+        if method not in ('ema', 'holt_winters'):
+            raise ValueError("method must be 'ema' or 'holt_winters'")
+        self.n_series = n_series
+        self.method = method
+        self.alpha, self.beta, self.gamma = alpha, beta, gamma
+        self.season_length = season_length
+        self.dtype = np.dtype(dtype)
+        self.level = np.zeros(n_series, dtype=self.dtype)
+        self.trend = np.zeros(n_series, dtype=self.dtype)
+        # (season_length, n_series) so the row for one phase is contiguous
+        self.season = np.zeros((season_length, n_series), dtype=self.dtype)
+        # A series starts from its own first reading, whenever that arrives
+        self.initialized = np.zeros(n_series, dtype=bool)
+        self.t = 0
+        self._scratch = np.empty(n_series, dtype=self.dtype)
+        self._previous = np.empty(n_series, dtype=self.dtype)
+
+    def predict(self, out=None):
+        """Forecast for the next timestamp of every series.
+
+        Series without any reading yet (see ``initialized``) forecast 0.
+        """
+        if out is None:
+            out = np.empty(self.n_series, dtype=self.dtype)
+        if self.method == 'ema':
+            np.copyto(out, self.level)
+        else:
+            np.add(self.level, self.trend, out=out)
+            out += self.season[self.t % self.season_length]
+        return out
+
+    def update(self, observed):
+        """Fold one timestamp of readings (length N) into every series.
+
+        NaN readings leave that series' state untouched. A series' first
+        non-NaN reading seeds its level instead of being smoothed in.
+        """
+        observed = np.asarray(observed, dtype=self.dtype)
+        missing = np.isnan(observed)
+        # Series that only take part in this step by being seeded, or not at all
+        idle = missing | ~self.initialized
+        if idle.any():
+            previous = (self.level.copy(), self.trend.copy(),
+                        self.season[self.t % self.season_length].copy())
+            observed = np.where(missing, self.predict(), observed)
+        else:
+            previous = None
+
+        if self.method == 'ema':
+            self._update_ema(observed)
+        else:
+            self._update_holt_winters(observed)
+
+        if previous is not None:
+            level, trend, season = previous
+            np.copyto(self.level, level, where=idle)
+            np.copyto(self.trend, trend, where=idle)
+            np.copyto(self.season[self.t % self.season_length], season, where=idle)
+            first = ~missing & ~self.initialized
+            np.copyto(self.level, observed, where=first)
+            self.initialized |= first
+        self.t += 1
+
+    def _update_ema(self, observed):
+        # level = α·observed + (1-α)·level, in place
+        self.level *= 1 - self.alpha
+        np.multiply(observed, self.alpha, out=self._scratch)
+        self.level += self._scratch
+
+    def _update_holt_winters(self, observed):
+        a, b, g = self.alpha, self.beta, self.gamma
+        season = self.season[self.t % self.season_length]
+        scratch, previous = self._scratch, self._previous
+        np.copyto(previous, self.level)
+        # level = α·(observed - season) + (1-α)·(level + trend)
+        self.level += self.trend
+        self.level *= 1 - a
+        np.subtract(observed, season, out=scratch)
+        scratch *= a
+        self.level += scratch
+        # trend = β·(level - previous level) + (1-β)·trend
+        self.trend *= 1 - b
+        np.subtract(self.level, previous, out=scratch)
+        scratch *= b
+        self.trend += scratch
+        # season = γ·(observed - level) + (1-γ)·season
+        season *= 1 - g
+        np.subtract(observed, self.level, out=scratch)
+        scratch *= g
+        season += scratch
+
+    def run(self, observations):
+        """One-step-ahead forecasts for a (T, N) matrix of readings.
+
+        A series' first reading is its own forecast, matching the
+        single-series script.
+        """
+        observations = np.asarray(observations, dtype=self.dtype)
+        forecasts = np.empty_like(observations)
+        for i, row in enumerate(observations):
+            self.predict(out=forecasts[i])
+            np.copyto(forecasts[i], row, where=~self.initialized)
+            self.update(row)
+        return forecasts
+
+
+def scalar_ema(temperatures, alpha=0.3):
+    """The original per-series loop from online_temperature_prediction.py."""
+    predictions = np.zeros(len(temperatures))
+    predictions[0] = temperatures[0]
+    for i in range(1, len(temperatures)):
+        predictions[i] = alpha * temperatures[i-1] + (1 - alpha) * predictions[i-1]
+    return predictions
+
+
+def generate_sensor_data(n_series, steps, noise=0.5, seed=42):
+    """Weekly-seasonal readings for many sensors, shaped (steps, n_series)."""
+    rng = np.random.default_rng(seed)
+    x = np.arange(steps)[:, None]
+    base = rng.normal(20, 3, n_series)
+    phase = rng.uniform(0, 2 * np.pi, n_series)
+    return base + 2 * np.sin(2 * np.pi * x / 7 + phase) + rng.normal(0, noise, (steps, n_series))
+
+
+def benchmark(n_series=50_000, steps=200, scalar_series=200):
+    """Series-updates per second: scalar loop vs vectorized EMA / Holt-Winters."""
+    data = generate_sensor_data(n_series, steps)
+
+    t0 = time.perf_counter()
+    for j in range(scalar_series):
+        scalar_ema(data[:, j])
+    scalar_rate = scalar_series * steps / (time.perf_counter() - t0)
+
+    print(f"{'Method':<26} {'Updates/sec':>14} {'Speedup':>9}")
+    print("-" * 51)
+    print(f"{'scalar loop (EMA)':<26} {scalar_rate:14,.0f} {1.0:9.1f}")
+    for method in ('ema', 'holt_winters'):
+        for dtype in (np.float64, np.float32):
+            forecaster = VectorizedForecaster(n_series, method=method, dtype=dtype)
+            rows = data.astype(dtype)
+            t0 = time.perf_counter()
+            for row in rows:
+                forecaster.update(row)
+            rate = n_series * steps / (time.perf_counter() - t0)
+            label = f"{method} ({np.dtype(dtype).name})"
+            print(f"{label:<26} {rate:14,.0f} {rate / scalar_rate:9.1f}")
+
+    # The vectorized EMA reproduces the scalar loop exactly
+    check = VectorizedForecaster(scalar_series).run(data[:, :scalar_series])
+    expected = np.column_stack([scalar_ema(data[:, j]) for j in range(scalar_series)])
+    print(f"\nMax difference vs scalar loop: {np.abs(check - expected).max():.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized forecaster")
+    parser.add_argument('--series', type=int, default=50_000)
+    parser.add_argument('--steps', type=int, default=200)
+    args = parser.parse_args()
+    benchmark(args.series, args.steps)
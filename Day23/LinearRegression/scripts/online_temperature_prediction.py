@@ -5,8 +5,11 @@ Simple Online Learning for Temperature Prediction
 A minimal implementation of online learning for temperature prediction.
 This version uses a simple moving average approach for stability.
 """
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
+from streaming_metrics import StreamingMetrics
+from parameter_sweep import make_grid, backtest, best_candidate
 
 def generate_temperature_data(days=30, noise=1.0):
     """Generate temperature data with a weekly pattern."""
@@ -16,7 +19,16 @@ def generate_temperature_data(days=30, noise=1.0):
     y = 20 + 2 * np.sin(2 * np.pi * x / 7) + np.random.normal(0, noise, days)
     return x, y
 
-def main():
+def tune_alpha(temperatures, alphas=np.round(np.linspace(0.05, 0.95, 19), 2)):
+    """Backtest every alpha in one vectorized pass and return the best one."""
+    grid = make_grid(alphas)
+    mae, _ = backtest(temperatures, grid)
+    params, best_mae = best_candidate(grid, mae)
+    print(f"Tuned α = {params['alpha']:.2f} over {len(alphas)} candidates "
+          f"(backtest MAE {best_mae:.2f}°C)\n")
+    return params['alpha']
+
+def main(alpha=0.3, tune=False):
     print("Simple Online Learning for Temperature Prediction\n")
     
     # Generate data
@@ -28,14 +40,16 @@ def main():
     predictions[0] = temperatures[0]
     
     # Simple online learning parameters
-    alpha = 0.3  # Learning rate for the moving average
+    # alpha is the learning rate for the moving average
+    if tune:
+        alpha = tune_alpha(temperatures)
     
     print(f"{'Day':>4} {'Actual':>8} {'Predicted':>10} "
           f"{'Error':>10} {'MAE':>10}")
     print("-" * 60)
     
-    # Track errors
-    abs_errors = []
+    # Track errors in constant memory
+    metrics = StreamingMetrics()
     
     # Online learning loop
     for i in range(1, days):
@@ -44,9 +58,8 @@ def main():
         
         # Calculate error
         error = predictions[i] - temperatures[i]
-        abs_error = abs(error)
-        abs_errors.append(abs_error)
-        mae = np.mean(abs_errors) if abs_errors else 0
+        metrics.update(temperatures[i], predictions[i])
+        mae = metrics.mae
         
         # Print progress
         if i % 5 == 0 or i == 1 or i == days-1:
@@ -54,7 +67,7 @@ def main():
                   f"{error:9.2f}°C {mae:9.2f}°C")
     
     # Calculate final metrics
-    mae = np.mean(abs_errors)
+    mae = metrics.mae
     
     # Plot results
     plt.figure(figsize=(12, 6))
@@ -82,7 +95,16 @@ def main():
     
     print("\nModel performance:")
     print(f"Mean Absolute Error: {mae:.2f}°C")
+    print(f"RMSE: {metrics.rmse:.2f}°C, Bias: {metrics.bias:+.2f}°C")
+    print(f"Absolute error p50/p95/p99: {metrics.quantile(0.5):.2f} / "
+          f"{metrics.quantile(0.95):.2f} / {metrics.quantile(0.99):.2f}°C")
     print(f"Final prediction: {predictions[-1]:.2f}°C (Actual: {temperatures[-1]:.2f}°C)")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Online temperature prediction")
+    parser.add_argument('--alpha', type=float, default=0.3,
+                        help="smoothing factor of the moving average")
+    parser.add_argument('--tune', action='store_true',
+                        help="pick alpha by backtesting a grid first")
+    args = parser.parse_args()
+    main(args.alpha, args.tune)
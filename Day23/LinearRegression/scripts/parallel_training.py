@@ -0,0 +1,188 @@
+"""
+Parallel Sharded Training
+-------------------------
+Spreads the sufficient-statistics pass of streaming_ols over a process pool.
+Every CSV shard is cut into fixed-size byte ranges; each range is reduced
+to train/held-out statistics by a worker and the partials are merged
+pairwise in a fixed tree order. Because the ranges and the merge order do
+not depend on the number of workers, the fitted model is bit-for-bit the
+same for any pool size.
+
+Run directly to benchmark 1..N workers against the single-process
+LinearRegression path:
+
+    python parallel_training.py --rows 2000000
+"""
+import argparse
+import glob
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_generator import write_dataset
+from streaming_ols import (FEATURE_COLUMNS, TARGET_COLUMN, SufficientStats,
+                           holdout_mask, solve_ols, evaluate)
+
+BLOCK_BYTES = 32 * 1024 * 1024
+
+
+def plan_byte_ranges(paths, block_bytes=BLOCK_BYTES):
+    """Cut every shard into (path, start, end, block_id) work units."""
+    units = []
+    for path in paths:
+        size = os.path.getsize(path)
+        for start in range(0, max(size, 1), block_bytes):
+            units.append((path, start, min(start + block_bytes, size), len(units)))
+    return units
+
+
+def read_byte_range(path, start, end):
+    """Return the complete lines whose first byte lies in [start, end)."""
+    with open(path, 'rb') as f:
+        if start > 0:
+            # The line straddling `start` belongs to the previous range
+            f.seek(start - 1)
+            f.readline()
+        else:
+            f.readline()  # header
+        begin = f.tell()
+        if begin >= end:
+            return b''
+        data = f.read(end - begin)
+        if data and not data.endswith(b'\n'):
+            data += f.readline()
+        return data
+
+
+def read_header(path):
+    with open(path) as f:
+        return f.readline().strip().split(',')
+
+
+def iter_range_chunks(unit, columns, chunksize=100_000):
+    """Yield (row key, float64 array) chunks of one byte range.
+
+    Rows are keyed on (block, local row), so hold-out assignment is fixed
+    by the block layout, not by which worker reads the block.
+    """
+    path, start, end, block_id = unit
+    data = read_byte_range(path, start, end)
+    if not data:
+        return
+    offset = block_id << 40
+    reader = pd.read_csv(io.BytesIO(data), header=None, names=read_header(path),
+                         usecols=columns, chunksize=chunksize)
+    for chunk in reader:
+        block = chunk[columns].to_numpy(dtype=np.float64)
+        yield offset, block
+        offset += len(block)
+
+
+def iter_shard_chunks(paths, columns, block_bytes=BLOCK_BYTES, chunksize=100_000):
+    """(row key, block) chunks of every shard, keyed like the parallel workers."""
+    for unit in plan_byte_ranges(paths, block_bytes):
+        yield from iter_range_chunks(unit, columns, chunksize)
+
+
+def range_statistics(unit, test_size=0.2, seed=42, chunksize=100_000):
+    """Worker: reduce one byte range to (train, held-out) statistics."""
+    columns = FEATURE_COLUMNS + [TARGET_COLUMN]
+    train = SufficientStats(len(columns))
+    test = SufficientStats(len(columns))
+    for offset, block in iter_range_chunks(unit, columns, chunksize):
+        mask = holdout_mask(offset, len(block), test_size, seed)
+        train.update(block[~mask])
+        test.update(block[mask])
+    return train, test
+
+
+def tree_reduce(partials):
+    """Merge statistics pairwise in a fixed order, independent of worker count."""
+    partials = [p.copy() for p in partials]
+    if not partials:
+        raise ValueError("no statistics to reduce")
+    while len(partials) > 1:
+        merged = []
+        for i in range(0, len(partials) - 1, 2):
+            merged.append(partials[i].merge(partials[i + 1]))
+        if len(partials) % 2:
+            merged.append(partials[-1])
+        partials = merged
+    return partials[0]
+
+
+def parallel_statistics(paths, workers=None, block_bytes=BLOCK_BYTES,
+                        test_size=0.2, seed=42):
+    """Compute train/held-out statistics of all shards with a process pool."""
+    units = plan_byte_ranges(paths, block_bytes)
+    args = [(unit, test_size, seed) for unit in units]
+    if workers == 1:
+        results = [range_statistics(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_range_statistics_star, args))
+    train = tree_reduce([r[0] for r in results])
+    test = tree_reduce([r[1] for r in results])
+    return train, test
+
+
+def _range_statistics_star(args):
+    return range_statistics(*args)
+
+
+def fit_parallel(paths, workers=None, block_bytes=BLOCK_BYTES, test_size=0.2, seed=42):
+    """Return coef, intercept, held-out (MSE, R²) and row counts."""
+    train, test = parallel_statistics(paths, workers, block_bytes, test_size, seed)
+    coef, intercept = solve_ols(train)
+    mse, r2 = evaluate(test, coef, intercept)
+    return coef, intercept, (mse, r2), (train.count, test.count)
+
+
+def find_shards(pattern='data/house_prices*.csv'):
+    """Sorted shard list so the work plan is the same on every run."""
+    return sorted(glob.glob(pattern))
+
+
+def benchmark(n_rows=2_000_000, max_workers=None, block_bytes=8 * 1024 * 1024):
+    """Wall time of 1..N workers against pd.read_csv + LinearRegression.fit."""
+    from sklearn.linear_model import LinearRegression
+
+    max_workers = max_workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'house_prices.csv')
+        print(f"Writing {n_rows:,} benchmark rows...")
+        write_dataset(path, n_rows)
+
+        t0 = time.perf_counter()
+        data = pd.read_csv(path)
+        LinearRegression().fit(data[FEATURE_COLUMNS], data[TARGET_COLUMN])
+        baseline = time.perf_counter() - t0
+        del data
+        print(f"\n{'Path':<24} {'Seconds':>8} {'Speedup':>8}")
+        print("-" * 42)
+        print(f"{'LinearRegression':<24} {baseline:8.2f} {1.0:8.2f}")
+
+        reference = None
+        for workers in range(1, max_workers + 1):
+            t0 = time.perf_counter()
+            coef, intercept, _, _ = fit_parallel([path], workers, block_bytes)
+            elapsed = time.perf_counter() - t0
+            same = reference is None or (np.array_equal(coef, reference[0])
+                                         and intercept == reference[1])
+            reference = reference or (coef, intercept)
+            label = f"parallel x{workers}"
+            print(f"{label:<24} {elapsed:8.2f} {baseline / elapsed:8.2f}"
+                  f"{'' if same else '  (MISMATCH)'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parallel sharded training")
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--max-workers', type=int, default=None)
+    args = parser.parse_args()
+    benchmark(args.rows, args.max_workers)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Vectorized Parameter Sweep / Backtest
+-------------------------------------
+Evaluates a whole grid of smoothing parameters for the online temperature
+predictor in one pass over the history. Every candidate is one "series" of
+a multi_series_forecaster.VectorizedForecaster with its own α (β, γ), so
+each timestamp is a single vectorized update of all candidates (times all
+sensors) and the history is read once. Large grids are split across a
+process pool.
+
+    python parameter_sweep.py --days 365 --sensors 100
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from multi_series_forecaster import VectorizedForecaster
+
+
+def make_grid(alphas, betas=None, gammas=None):
+    """Cartesian product of parameter values as a dict of equal-length arrays."""
+    if betas is None and gammas is None:
+        return {'alpha': np.asarray(alphas, dtype=np.float64)}
+    combos = np.array(list(itertools.product(alphas, [0.0] if betas is None else betas,
+                                          [0.0] if gammas is None else gammas)))
+    return {'alpha': combos[:, 0], 'beta': combos[:, 1], 'gamma': combos[:, 2]}
+
+
+def backtest(history, grid, method='ema', season_length=7, warmup=1):
+    """One-step-ahead MAE and RMSE for every candidate in ``grid``.
+
+    ``history`` is (T,) for one series or (T, N) for N sensors; metrics are
+    averaged over sensors. Cost is one vectorized update per timestamp over
+    K candidates × N sensors.
+    """
+    history = np.asarray(history, dtype=np.float64)
+    if history.ndim == 1:
+        history = history[:, None]
+    n_steps, n_sensors = history.shape
+    n_candidates = len(grid['alpha'])
+
+    def per_series(name, default):
+        values = grid.get(name)
+        if values is None:
+            return default
+        return np.repeat(np.asarray(values, dtype=np.float64), n_sensors)
+
+    forecaster = VectorizedForecaster(
+        n_candidates * n_sensors, method=method,
+        alpha=per_series('alpha', 0.3), beta=per_series('beta', 0.05),
+        gamma=per_series('gamma', 0.2), season_length=season_length)
+
+    abs_sum = np.zeros(n_candidates * n_sensors)
+    sq_sum = np.zeros(n_candidates * n_sensors)
+    forecast = np.empty(n_candidates * n_sensors)
+    error = np.empty(n_candidates * n_sensors)
+    n_scored = 0
+    for i in range(n_steps):
+        # Candidate-major layout: [cand0: sensors..., cand1: sensors..., ...]
+        observed = np.tile(history[i], n_candidates)
+        if i >= warmup:
+            forecaster.predict(out=forecast)
+            np.subtract(forecast, observed, out=error)
+            abs_sum += np.abs(error)
+            sq_sum += error * error
+            n_scored += 1
+        forecaster.update(observed)
+
+    n_scored = max(n_scored, 1)
+    mae = (abs_sum / n_scored).reshape(n_candidates, n_sensors).mean(axis=1)
+    rmse = np.sqrt((sq_sum / n_scored).reshape(n_candidates, n_sensors).mean(axis=1))
+    return mae, rmse
+
+
+def _backtest_slice(args):
+    history, grid, method, season_length, warmup = args
+    return backtest(history, grid, method, season_length, warmup)
+
+
+def parallel_backtest(history, grid, method='ema', season_length=7, warmup=1,
+                      workers=None, min_candidates_per_worker=8):
+    """Split the grid across processes; results come back in grid order."""
+    n_candidates = len(grid['alpha'])
+    workers = workers or os.cpu_count() or 1
+    n_parts = max(1, min(workers, n_candidates // min_candidates_per_worker))
+    if n_parts == 1:
+        return backtest(history, grid, method, season_length, warmup)
+    bounds = np.linspace(0, n_candidates, n_parts + 1).astype(int)
+    parts = [({k: v[lo:hi] for k, v in grid.items()}) for lo, hi in zip(bounds, bounds[1:])]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_backtest_slice,
+                                [(history, part, method, season_length, warmup) for part in parts]))
+    return (np.concatenate([r[0] for r in results]),
+            np.concatenate([r[1] for r in results]))
+
+
+def best_candidate(grid, mae):
+    """Parameters of the candidate with the lowest MAE."""
+    best = int(np.argmin(mae))
+    return {name: float(values[best]) for name, values in grid.items()}, float(mae[best])
+
+
+if __name__ == "__main__":
+    from multi_series_forecaster import generate_sensor_data
+
+    parser = argparse.ArgumentParser(description="Backtest a grid of smoothing parameters")
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--sensors', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    history = generate_sensor_data(args.sensors, args.days)
+    alphas = np.round(np.linspace(0.05, 0.95, 19), 2)
+
+    grid = make_grid(alphas)
+    mae, rmse = parallel_backtest(history, grid, 'ema', workers=args.workers)
+    params, best_mae = best_candidate(grid, mae)
+    print(f"EMA: {len(alphas)} candidates, best α = {params['alpha']:.2f} (MAE {best_mae:.3f})")
+
+    grid = make_grid(alphas, [0.0, 0.05, 0.1], [0.1, 0.2, 0.3, 0.5])
+    mae, rmse = parallel_backtest(history, grid, 'holt_winters', warmup=14, workers=args.workers)
+    params, best_mae = best_candidate(grid, mae)
+    print(f"Holt-Winters: {len(grid['alpha'])} candidates, best "
+          f"α = {params['alpha']:.2f}, β = {params['beta']:.2f}, γ = {params['gamma']:.2f} "
+          f"(MAE {best_mae:.3f})")
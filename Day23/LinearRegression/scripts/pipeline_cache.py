@@ -0,0 +1,292 @@
+"""
+Content-Addressed Pipeline Cache
+--------------------------------
+Lets the scheduled batch pipeline skip stages whose inputs have not
+changed. Each stage run (generate, train, plot, predict) is keyed on a hash
+of:
+
+- its parameters (mode, folds, chunk size, ...),
+- the content of its input files (training data, the model it scores),
+- the source code of the functions and modules that implement it, plus the
+  NumPy/pandas/scikit-learn versions.
+
+The index (.pipeline_cache/index.json) maps each key to the artifacts the
+stage wrote and to its return value. On a hit the recorded artifacts are
+reused, as long as they are still on disk unchanged (same size and mtime).
+No new timestamped files are written, so a rerun on the same data is a
+no-op.
+
+Input files are hashed in full only when their size or mtime changed since
+the last run, so checking a large unchanged CSV costs one stat call.
+
+Entries that have not been used for max_age_days are evicted together with
+their artifacts. If the artifacts still exceed max_bytes, the least
+recently used entries go next. Entries used in the current run are never
+evicted. An evicted entry's artifacts are only deleted while they are
+unchanged since the cache recorded them, and never when they are protected
+(e.g. the registry's current model) or an input of this run. evict_stale
+does this for the pipeline and the --evict CLI alike, and drops evicted
+models from the registry.
+
+    python pipeline_cache.py                     # list entries
+    python pipeline_cache.py --evict --max-mb 500 --max-age-days 7
+"""
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import tempfile
+import time
+from importlib import metadata
+
+from incremental_model import state_path_for
+from model_export import export_path_for
+from model_registry import ModelRegistry, file_digest
+
+INDEX_NAME = 'index.json'
+
+
+def _stat(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _library_versions():
+    versions = {}
+    for name in ('numpy', 'pandas', 'scikit-learn'):
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def code_hash(*objects):
+    """Hash of the source of functions, classes or modules (or module names), plus library versions."""
+    digest = hashlib.blake2b(digest_size=16)
+    for obj in objects:
+        if isinstance(obj, str):
+            obj = importlib.import_module(obj)
+        digest.update(inspect.getsource(obj).encode())
+    digest.update(json.dumps(_library_versions(), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class PipelineCache:
+    """JSON-indexed cache of stage results and the artifacts they wrote."""
+
+    def __init__(self, root='.pipeline_cache'):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self._index = self._read_index()
+        self._used = set()
+        self._inputs = set()
+
+    # -- index ---------------------------------------------------------
+
+    def _read_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'entries': {}, 'digests': {}}
+
+    def _write_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def entries(self):
+        return list(self._index['entries'].values())
+
+    # -- keys ----------------------------------------------------------
+
+    def file_digest(self, paths):
+        """Content hash of input files; rehashed only when size or mtime changes."""
+        if isinstance(paths, str):
+            paths = [paths]
+        for path in paths:
+            files = ([os.path.join(path, name) for name in os.listdir(path)]
+                     if os.path.isdir(path) else [path])
+            self._inputs.update(os.path.normpath(name) for name in files)
+        return file_digest(paths, self._index['digests'])
+
+    def key(self, stage, params=None, inputs=(), code=None):
+        """Cache key of one stage run.
+
+        ``inputs`` are file paths (hashed by content) or lists of paths;
+        ``code`` is a code_hash of whatever implements the stage.
+        """
+        spec = {
+            'stage': stage,
+            'params': params or {},
+            'inputs': [self.file_digest(paths) for paths in inputs],
+            'code': code,
+        }
+        return hashlib.blake2b(json.dumps(spec, sort_keys=True, default=str).encode(),
+                               digest_size=16).hexdigest()
+
+    # -- lookup / store ------------------------------------------------
+
+    def lookup(self, key):
+        """The entry for ``key`` if all its artifacts are still intact, else None."""
+        entry = self._index['entries'].get(key)
+        if entry is None:
+            return None
+        for output in entry['outputs'].values():
+            try:
+                intact = list(_stat(output['path'])) == [output['size'], output['mtime_ns']]
+            except FileNotFoundError:
+                intact = False
+            if not intact:
+                del self._index['entries'][key]
+                self._write_index()
+                return None
+        entry['last_used'] = time.time()
+        entry['hits'] = entry.get('hits', 0) + 1
+        self._used.add(key)
+        self._write_index()
+        return entry
+
+    def store(self, stage, key, outputs, value=None):
+        """Record the artifacts a stage wrote ({name: path}) and its JSON-able result."""
+        now = time.time()
+        recorded = {}
+        for name, path in outputs.items():
+            size, mtime_ns = _stat(path)
+            recorded[name] = {'path': path, 'size': size, 'mtime_ns': mtime_ns}
+        entry = {'stage': stage, 'key': key, 'outputs': recorded, 'value': value,
+                 'bytes': sum(o['size'] for o in recorded.values()),
+                 'created': now, 'last_used': now, 'hits': 0}
+        self._index['entries'][key] = entry
+        self._used.add(key)
+        self._write_index()
+        return entry
+
+    def run(self, stage, key, compute):
+        """Return (value, hit): the cached result, or compute() -> (value, outputs) stored."""
+        entry = self.lookup(key)
+        if entry is not None:
+            return entry['value'], True
+        value, outputs = compute()
+        self.store(stage, key, outputs, value)
+        return value, False
+
+    def owner(self, path, stage=None):
+        """The entry whose artifact ``path`` is, unmodified since it was written, if any."""
+        try:
+            stat = list(_stat(path))
+        except FileNotFoundError:
+            return None
+        for entry in self._index['entries'].values():
+            if stage is not None and entry['stage'] != stage:
+                continue
+            for output in entry['outputs'].values():
+                if output['path'] == path and [output['size'], output['mtime_ns']] == stat:
+                    return entry
+        return None
+
+    # -- eviction ------------------------------------------------------
+
+    def total_bytes(self):
+        return sum(entry['bytes'] for entry in self._index['entries'].values())
+
+    def evict(self, max_bytes=None, max_age_days=None, protect=()):
+        """Delete stale entries and their artifacts; returns the evicted entries.
+
+        An artifact is only deleted while it is still exactly what the stage
+        wrote (same size and mtime); a file someone replaced since, like a
+        user's own dataset at the generator's path, stays. Artifacts in
+        ``protect``, inputs of stages keyed in this run, and artifacts still
+        referenced by a kept entry also stay on disk when their entry goes.
+        """
+        protect = {os.path.normpath(p) for p in protect} | self._inputs
+        entries = self._index['entries']
+        candidates = sorted((e for k, e in entries.items() if k not in self._used),
+                            key=lambda e: e['last_used'])
+        evicted = []
+        if max_age_days is not None:
+            cutoff = time.time() - max_age_days * 86400
+            evicted = [e for e in candidates if e['last_used'] < cutoff]
+        if max_bytes is not None:
+            total = self.total_bytes() - sum(e['bytes'] for e in evicted)
+            for entry in candidates:
+                if total <= max_bytes:
+                    break
+                if entry not in evicted:
+                    evicted.append(entry)
+                    total -= entry['bytes']
+        for entry in evicted:
+            del entries[entry['key']]
+        kept = {os.path.normpath(o['path']) for e in entries.values() for o in e['outputs'].values()}
+        for entry in evicted:
+            for output in entry['outputs'].values():
+                path = os.path.normpath(output['path'])
+                if path in protect or path in kept:
+                    continue
+                try:
+                    if list(_stat(path)) == [output['size'], output['mtime_ns']]:
+                        os.remove(path)
+                        self._index['digests'].pop(output['path'], None)
+                except FileNotFoundError:
+                    self._index['digests'].pop(output['path'], None)
+        if evicted:
+            self._write_index()
+        return evicted
+
+
+def model_artifacts(model_path):
+    """Every file save_model wrote for one model."""
+    paths = {'model': model_path, 'export': export_path_for(model_path),
+             'state': state_path_for(model_path)}
+    return {name: path for name, path in paths.items() if os.path.exists(path)}
+
+
+def evict_stale(cache, max_bytes=None, max_age_days=None, registry=None, protect=()):
+    """Evict stale cache entries and keep the model registry consistent.
+
+    The registry's current model is always protected, and evicted models
+    whose artifact is gone are removed from the registry, so consumers
+    never resolve a deleted file.
+    """
+    registry = registry if registry is not None else ModelRegistry('models')
+    protect = list(protect)
+    try:
+        protect.extend(model_artifacts(registry.resolve('current')['path']).values())
+    except LookupError:
+        pass
+    evicted = cache.evict(max_bytes, max_age_days, protect=protect)
+    for entry in evicted:
+        if entry['stage'] == 'train' and not os.path.exists(entry['value']):
+            registry.remove(entry['value'])
+    return evicted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or evict the pipeline cache")
+    parser.add_argument('--root', default='.pipeline_cache')
+    parser.add_argument('--evict', action='store_true')
+    parser.add_argument('--max-mb', type=float, default=None)
+    parser.add_argument('--max-age-days', type=float, default=None)
+    parser.add_argument('--models', default='models',
+                        help="model registry directory kept in sync with evictions")
+    args = parser.parse_args()
+
+    cache = PipelineCache(args.root)
+    if args.evict:
+        max_bytes = args.max_mb * 2**20 if args.max_mb is not None else None
+        evicted = evict_stale(cache, max_bytes, args.max_age_days, ModelRegistry(args.models))
+        print(f"Evicted {len(evicted)} entr{'y' if len(evicted) == 1 else 'ies'} "
+              f"({sum(e['bytes'] for e in evicted) / 2**20:.1f} MB)")
+    entries = sorted(cache.entries(), key=lambda e: e['last_used'])
+    print(f"{len(entries)} cached stage run(s), {cache.total_bytes() / 2**20:.1f} MB "
+          f"in {cache.index_path}")
+    for entry in entries:
+        used = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_used']))
+        paths = ', '.join(o['path'] for o in entry['outputs'].values())
+        print(f"  {entry['stage']:<9} {entry['key'][:12]}  last used {used}  "
+              f"hits {entry['hits']:>4}  {entry['bytes'] / 2**20:8.2f} MB  {paths}")
@@ -0,0 +1,255 @@
+"""
+Pipeline Stage Tracing
+----------------------
+Timed spans around the stages of the batch pipeline (data generation, CSV
+parsing, fit, predict, joblib.dump, savefig, ...). Each span records wall
+time, CPU time, peak traced memory and the rows it processed; spans nest,
+so a stage's children show where its time went.
+
+Tracing is off by default. A disabled tracer hands out one shared no-op
+span, so the instrumentation costs one attribute check per stage. When it
+is enabled, peak memory comes from tracemalloc (which slows allocation-heavy
+code somewhat; pass memory=False to skip it).
+
+    tracer.enable()
+    with tracer.span('fit', rows=len(X)):
+        model.fit(X, y)
+    tracer.write_json('trace.json')
+    print(tracer.summary())
+
+Compare two runs, e.g. last night's and tonight's:
+
+    python pipeline_trace.py traces/old.json traces/new.json
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+
+class _NullSpan:
+    """Shared span handed out while tracing is disabled."""
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed stage; set ``rows`` inside the block if it is not known up front."""
+
+    def __init__(self, tracer, name, rows=None):
+        self.tracer = tracer
+        self.name = name
+        self.rows = rows
+        self.parent = None
+        self.depth = 0
+        self.start = 0.0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_bytes = 0
+        self.error = None
+
+    def __enter__(self):
+        stack = self.tracer._stack
+        if stack:
+            self.parent = stack[-1].name
+            self.depth = len(stack)
+        if self.tracer.memory:
+            # Fold the peak so far into the parent before this span resets it
+            if stack:
+                stack[-1].peak_bytes = max(stack[-1].peak_bytes, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        stack.append(self)
+        self._cpu0 = time.process_time()
+        self._wall0 = time.perf_counter()
+        self.start = self._wall0 - self.tracer.started
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall = time.perf_counter() - self._wall0
+        self.cpu = time.process_time() - self._cpu0
+        stack = self.tracer._stack
+        stack.pop()
+        if self.tracer.memory:
+            self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1].peak_bytes = max(stack[-1].peak_bytes, self.peak_bytes)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.tracer.spans.append(self)
+        return False
+
+    def to_dict(self):
+        return {'name': self.name, 'parent': self.parent, 'depth': self.depth,
+                'start_s': round(self.start, 6), 'wall_s': round(self.wall, 6),
+                'cpu_s': round(self.cpu, 6),
+                'peak_mb': round(self.peak_bytes / 2**20, 3) if self.tracer.memory else None,
+                'rows': self.rows, 'error': self.error}
+
+
+class Tracer:
+    """Collects spans for one run of the pipeline."""
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.spans = []
+        self._stack = []
+        self.started = time.perf_counter()
+        self.started_at = None
+
+    def enable(self, memory=True):
+        self.enabled = True
+        self.memory = memory
+        self.spans = []
+        self._stack = []
+        self.started = time.perf_counter()
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        return self
+
+    def disable(self):
+        self.enabled = False
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return self
+
+    def span(self, name, rows=None):
+        """Context manager timing one stage; a no-op while disabled."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, rows)
+
+    def traced(self, name=None):
+        """Decorator that wraps every call of a function in a span."""
+        def decorate(fn):
+            label = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with Span(self, label):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def to_dict(self):
+        return {
+            'run': {'started_at': self.started_at, 'argv': sys.argv,
+                    'python': platform.python_version(), 'host': platform.node(),
+                    'total_wall_s': round(time.perf_counter() - self.started, 6)},
+            'spans': [s.to_dict() for s in sorted(self.spans, key=lambda s: s.start)],
+        }
+
+    def write_json(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def summary(self):
+        return format_summary(self.to_dict()['spans'])
+
+
+def aggregate(spans):
+    """Spans with the same name and parent summed, in order of first appearance."""
+    stages = {}
+    for span in spans:
+        key = (span['depth'], span['parent'], span['name'])
+        stage = stages.setdefault(key, {'name': span['name'], 'parent': span['parent'],
+                                        'depth': span['depth'], 'calls': 0, 'wall_s': 0.0,
+                                        'cpu_s': 0.0, 'peak_mb': None, 'rows': None})
+        stage['calls'] += 1
+        stage['wall_s'] += span['wall_s']
+        stage['cpu_s'] += span['cpu_s']
+        if span['peak_mb'] is not None:
+            stage['peak_mb'] = max(stage['peak_mb'] or 0.0, span['peak_mb'])
+        if span['rows'] is not None:
+            stage['rows'] = (stage['rows'] or 0) + span['rows']
+    return list(stages.values())
+
+
+def format_summary(spans):
+    lines = [f"{'Stage':<32} {'Calls':>5} {'Wall s':>9} {'CPU s':>9} {'Peak MB':>9} "
+             f"{'Rows':>12} {'Rows/s':>12}",
+             "-" * 94]
+    for stage in aggregate(spans):
+        label = '  ' * stage['depth'] + stage['name']
+        peak = f"{stage['peak_mb']:9.1f}" if stage['peak_mb'] is not None else f"{'-':>9}"
+        rows = f"{stage['rows']:>12,}" if stage['rows'] is not None else f"{'-':>12}"
+        rate = (f"{stage['rows'] / stage['wall_s']:>12,.0f}"
+                if stage['rows'] and stage['wall_s'] > 0 else f"{'-':>12}")
+        lines.append(f"{label:<32} {stage['calls']:>5} {stage['wall_s']:9.3f} "
+                     f"{stage['cpu_s']:9.3f} {peak} {rows} {rate}")
+    return '\n'.join(lines)
+
+
+def compare(old_trace, new_trace, threshold=1.2, min_seconds=0.05):
+    """Per-stage wall time of two traces; stages slower than ``threshold``× are flagged.
+
+    Stages under ``min_seconds`` in the new run are never flagged, so
+    millisecond jitter does not show up as a regression.
+    """
+    old = {(s['depth'], s['parent'], s['name']): s for s in aggregate(old_trace['spans'])}
+    lines = [f"{'Stage':<32} {'Old s':>9} {'New s':>9} {'Ratio':>7}", "-" * 60]
+    regressions = []
+    for stage in aggregate(new_trace['spans']):
+        label = '  ' * stage['depth'] + stage['name']
+        before = old.get((stage['depth'], stage['parent'], stage['name']))
+        if before is None or before['wall_s'] <= 0:
+            lines.append(f"{label:<32} {'-':>9} {stage['wall_s']:9.3f} {'new':>7}")
+            continue
+        ratio = stage['wall_s'] / before['wall_s']
+        flag = ''
+        if ratio > threshold and stage['wall_s'] >= min_seconds:
+            flag = '  <- slower'
+            regressions.append(stage['name'])
+        lines.append(f"{label:<32} {before['wall_s']:9.3f} {stage['wall_s']:9.3f} "
+                     f"{ratio:6.2f}x{flag}")
+    return '\n'.join(lines), regressions
+
+
+# Process-wide tracer used by the pipeline scripts
+tracer = Tracer()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two pipeline traces stage by stage")
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="flag stages whose wall time grew by more than this factor")
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help="ignore stages shorter than this in the new run")
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old_trace = json.load(f)
+    with open(args.new) as f:
+        new_trace = json.load(f)
+    table, regressions = compare(old_trace, new_trace, args.threshold, args.min_seconds)
+    print(table)
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than {args.threshold:.2f}x: "
+              f"{', '.join(regressions)}")
+        sys.exit(1)
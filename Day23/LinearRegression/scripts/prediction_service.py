@@ -0,0 +1,282 @@
+"""
+House Price Prediction Service
+------------------------------
+A long-running asyncio HTTP service that loads a trained model once and
+answers price requests. Concurrent requests are collected into
+micro-batches (flushed at max_batch_size rows or after max_wait_ms), so
+every batch is scored with one vectorized predict.
+
+Endpoints:
+    POST /predict   {"size_sqft": 1200, "bedrooms": 2, "age_years": 5}
+                    or a list of such objects
+                    or {"features": [[1200, 2, 5], [1800, 3, 10]]}
+    GET  /metrics   request/row/batch counters, throughput, p50/p99 latency
+    GET  /health
+
+With --registry the service follows models/registry.json and hot-swaps to a
+newly promoted model without a restart.
+
+    python prediction_service.py --port 8000
+"""
+import argparse
+import asyncio
+import glob
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+from batch_scoring import load_linear_model, score_block
+from model_registry import ModelRegistry
+
+
+def latest_model_path(pattern='models/house_price_model_*.joblib'):
+    """Newest timestamped model artifact."""
+    paths = sorted(glob.glob(pattern))
+    if not paths:
+        raise FileNotFoundError(f"No model matches {pattern}; run batch_ml_example.py first")
+    return paths[-1]
+
+
+class LatencyTracker:
+    """Counters plus a bounded window of recent request latencies."""
+
+    def __init__(self, window=10_000):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+
+    def record_request(self, n_rows, seconds):
+        self.requests += 1
+        self.rows += n_rows
+        self.latencies.append(seconds)
+
+    def snapshot(self):
+        uptime = time.perf_counter() - self.started
+        if self.latencies:
+            p50, p99 = np.percentile(np.fromiter(self.latencies, float), [50, 99]) * 1000
+        else:
+            p50 = p99 = 0.0
+        return {
+            'requests': self.requests,
+            'rows': self.rows,
+            'batches': self.batches,
+            'rows_per_batch': self.rows / self.batches if self.batches else 0.0,
+            'requests_per_sec': self.requests / uptime,
+            'rows_per_sec': self.rows / uptime,
+            'latency_p50_ms': float(p50),
+            'latency_p99_ms': float(p99),
+        }
+
+
+class MicroBatcher:
+    """Queue concurrent requests and score them together."""
+
+    def __init__(self, coef, intercept, max_batch_size=1024, max_wait_ms=2.0,
+                 tracker=None):
+        self.coef = coef
+        self.intercept = intercept
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.tracker = tracker or LatencyTracker()
+        self.queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def predict(self, features):
+        """Score a (n_rows, n_features) array; resolves when its batch is flushed."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((features, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            n_rows = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while n_rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+            self._flush(batch)
+
+    def _flush(self, batch):
+        matrix = np.concatenate([features for features, _ in batch])
+        try:
+            predictions = score_block(matrix, self.coef, self.intercept)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        self.tracker.batches += 1
+        offset = 0
+        for features, future in batch:
+            n = len(features)
+            if not future.done():
+                future.set_result(predictions[offset:offset + n])
+            offset += n
+
+
+def parse_features(payload, feature_names):
+    """Turn a JSON body into a float64 (n_rows, n_features) matrix."""
+    if isinstance(payload, dict) and 'features' in payload:
+        rows = payload['features']
+        if rows and not isinstance(rows[0], (list, tuple)):
+            rows = [rows]
+    else:
+        records = payload if isinstance(payload, list) else [payload]
+        rows = [[record[name] for name in feature_names] for record in records]
+    matrix = np.asarray(rows, dtype=np.float64)
+    if matrix.ndim != 2 or matrix.shape[1] != len(feature_names) or not len(matrix):
+        raise ValueError(f"expected rows of {len(feature_names)} features: {feature_names}")
+    return matrix
+
+
+class PredictionService:
+    """Minimal HTTP/1.1 front end (keep-alive) over a MicroBatcher."""
+
+    def __init__(self, model_path=None, max_batch_size=1024, max_wait_ms=2.0,
+                 registry=None, poll_seconds=1.0):
+        self.registry = registry
+        self.poll_seconds = poll_seconds
+        if registry is not None:
+            entry, model = registry.current()
+            model_path = entry['path']
+            coef, intercept = model.coef_, float(model.intercept_)
+            self.feature_names = list(model.feature_names_in_)
+        else:
+            coef, intercept, self.feature_names = load_linear_model(model_path)
+        self.model_path = self._checked_path = model_path
+        self.tracker = LatencyTracker()
+        self.batcher = MicroBatcher(coef, intercept, max_batch_size, max_wait_ms,
+                                    self.tracker)
+
+    async def watch_registry(self):
+        """Swap in the registry's current model whenever it changes.
+
+        Requests are parsed into the served feature order, so a new model's
+        coefficients are reordered to it; a model with other features is
+        not swapped in.
+        """
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                path = self.registry.resolve('current')['path']
+                if path == self._checked_path:
+                    continue
+                entry, model = self.registry.load(path)
+            except (LookupError, OSError, ValueError) as exc:
+                print(f"Registry check failed: {exc}")
+                continue
+            names = list(model.feature_names_in_)
+            if sorted(names) != sorted(self.feature_names):
+                print(f"Not swapping to {path}: features {names} differ from "
+                      f"the served {self.feature_names}")
+                self._checked_path = path
+                continue
+            coef = np.asarray(model.coef_)[[names.index(n) for n in self.feature_names]]
+            # Both fields change between awaits, so no batch sees a mix
+            self.batcher.coef = coef
+            self.batcher.intercept = float(model.intercept_)
+            self.model_path = self._checked_path = entry['path']
+            print(f"Hot-swapped to {self.model_path}")
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+                status, response = await self.route(method, path, body)
+                data = json.dumps(response).encode()
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return '200 OK', {'status': 'ok', 'model': self.model_path}
+        if method == 'GET' and path == '/metrics':
+            return '200 OK', self.tracker.snapshot()
+        if method == 'POST' and path == '/predict':
+            t0 = time.perf_counter()
+            try:
+                features = parse_features(json.loads(body), self.feature_names)
+            except KeyError as exc:
+                return '400 Bad Request', {'error': f"missing feature {exc}"}
+            except (ValueError, TypeError) as exc:
+                return '400 Bad Request', {'error': str(exc)}
+            predictions = await self.batcher.predict(features)
+            self.tracker.record_request(len(features), time.perf_counter() - t0)
+            return '200 OK', {'predicted_price': predictions.round(2).tolist()}
+        return '404 Not Found', {'error': f"no route for {method} {path}"}
+
+    async def serve(self, host='127.0.0.1', port=8000):
+        self.batcher.start()
+        if self.registry is not None:
+            asyncio.get_running_loop().create_task(self.watch_registry())
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving {self.model_path} on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve house price predictions")
+    parser.add_argument('--model', default=None, help="defaults to the newest model in models/")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=1024)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--registry', action='store_true',
+                        help="serve the registry's current model and follow promotions")
+    args = parser.parse_args()
+
+    if args.registry:
+        service = PredictionService(max_batch_size=args.max_batch_size,
+                                    max_wait_ms=args.max_wait_ms,
+                                    registry=ModelRegistry('models'))
+    else:
+        service = PredictionService(args.model or latest_model_path(),
+                                    args.max_batch_size, args.max_wait_ms)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nService stopped")
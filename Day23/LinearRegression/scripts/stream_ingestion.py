@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Streaming Temperature Ingestion
+-------------------------------
+An asyncio pipeline that attaches the online temperature predictor to a
+live feed instead of an in-memory array:
+
+    source  ->  bounded queue  ->  time-window batcher  ->  EMA forecaster
+
+Sources yield readings in small blocks of (timestamp, sensor_id, value).
+The supported sources are a local TCP socket (one "timestamp,sensor,value"
+line per reading), a tailed file and a plain generator. The queue between
+the stages is bounded, so a slow consumer makes the producer wait (and, for
+sockets, stops reading so TCP pushes back) instead of buffering without
+limit. Each time window becomes one vectorized update of
+multi_series_forecaster.VectorizedForecaster, and the forecast errors feed
+streaming_metrics.StreamingMetrics.
+
+A local stand-in producer lets the pipeline be measured without a real feed:
+
+    python stream_ingestion.py --source generator --sensors 1000 --readings 5e6
+    python stream_ingestion.py --source socket --sensors 1000 --readings 1e6
+"""
+import argparse
+import asyncio
+import io
+import os
+import time
+
+import numpy as np
+
+from multi_series_forecaster import VectorizedForecaster
+from streaming_metrics import StreamingMetrics
+
+
+class IngestionStats:
+    """Throughput, lag and backpressure counters for the pipeline."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.received = 0
+        self.processed = 0
+        self.windows = 0
+        self.late = 0
+        self.malformed = 0
+        self.producer_waits = 0
+        self.max_queue_depth = 0
+        self.last_event_time = float('nan')
+        self.last_lag = float('nan')
+
+    def snapshot(self, queue=None):
+        elapsed = time.perf_counter() - self.started
+        return {
+            'received': self.received,
+            'processed': self.processed,
+            'windows': self.windows,
+            'late_dropped': self.late,
+            'malformed': self.malformed,
+            'readings_per_sec': self.processed / elapsed if elapsed > 0 else 0.0,
+            'queue_depth': queue.qsize() if queue is not None else 0,
+            'max_queue_depth': self.max_queue_depth,
+            'producer_waits': self.producer_waits,
+            'lag_seconds': self.last_lag,
+        }
+
+
+def parse_lines(data, stats=None):
+    """Parse b'ts,sensor,value\\n...' into (timestamps, sensors, values) arrays.
+
+    Lines without exactly three numeric fields are dropped and counted in
+    ``stats.malformed``; they never shift the fields of the other lines.
+    """
+    rows = np.empty((0, 3))
+    try:
+        if data.strip():
+            rows = np.loadtxt(io.BytesIO(data), delimiter=',', ndmin=2)
+    except ValueError:
+        rows = None
+    if rows is None or rows.shape[1] != 3:
+        good = []
+        for line in data.splitlines():
+            fields = line.split(b',')
+            try:
+                if len(fields) != 3:
+                    raise ValueError
+                good.append([float(field) for field in fields])
+            except ValueError:
+                if line.strip() and stats is not None:
+                    stats.malformed += 1
+        rows = np.array(good, dtype=np.float64).reshape(-1, 3)
+    return rows[:, 0], rows[:, 1].astype(np.int64), rows[:, 2]
+
+
+async def put_block(queue, block, stats):
+    """Put with backpressure accounting."""
+    if queue.full():
+        stats.producer_waits += 1
+    await queue.put(block)
+    stats.received += len(block[0])
+    stats.max_queue_depth = max(stats.max_queue_depth, queue.qsize())
+
+
+async def generator_source(blocks, queue, stats):
+    """Feed blocks from a (sync or async) iterable of (ts, sensors, values)."""
+    if hasattr(blocks, '__aiter__'):
+        async for block in blocks:
+            await put_block(queue, block, stats)
+    else:
+        for block in blocks:
+            await put_block(queue, block, stats)
+            await asyncio.sleep(0)
+
+
+async def _put_lines(data, queue, stats):
+    """Queue the readings in complete lines; bad lines only count as malformed."""
+    block = parse_lines(data, stats)
+    if len(block[0]):
+        await put_block(queue, block, stats)
+
+
+async def _read_lines(reader, queue, stats, block_bytes=1 << 16):
+    pending = b''
+    while True:
+        data = await reader.read(block_bytes)
+        if not data:
+            break
+        data = pending + data
+        cut = data.rfind(b'\n') + 1
+        pending = data[cut:]
+        if cut:
+            await _put_lines(data[:cut], queue, stats)
+
+
+async def socket_source(host, port, queue, stats, ready=None, expected_connections=1):
+    """Listen on a local TCP port and ingest lines from connected producers."""
+    done = asyncio.Event()
+    remaining = [expected_connections]
+
+    async def handle(reader, writer):
+        try:
+            await _read_lines(reader, queue, stats)
+        finally:
+            writer.close()
+            remaining[0] -= 1
+            if remaining[0] <= 0:
+                done.set()
+
+    server = await asyncio.start_server(handle, host, port)
+    if ready is not None:
+        ready.set_result(server.sockets[0].getsockname()[1])
+    async with server:
+        await done.wait()
+
+
+async def tail_source(path, queue, stats, poll_interval=0.2, stop=None):
+    """Follow a growing file like `tail -f` until ``stop`` is set."""
+    with open(path, 'rb') as f:
+        pending = b''
+        while stop is None or not stop.is_set():
+            data = f.read(1 << 16)
+            if not data:
+                await asyncio.sleep(poll_interval)
+                continue
+            data = pending + data
+            cut = data.rfind(b'\n') + 1
+            pending = data[cut:]
+            if cut:
+                await _put_lines(data[:cut], queue, stats)
+
+
+class WindowBatcher:
+    """Group readings into event-time windows and step the forecaster per window."""
+
+    def __init__(self, n_sensors, window_seconds=60.0, alpha=0.3, stats=None):
+        self.n_sensors = n_sensors
+        self.window_seconds = window_seconds
+        self.forecaster = VectorizedForecaster(n_sensors, alpha=alpha)
+        self.metrics = StreamingMetrics()
+        self.stats = stats or IngestionStats()
+        self.current = None
+        self._sums = np.zeros(n_sensors)
+        self._counts = np.zeros(n_sensors)
+
+    def add(self, timestamps, sensors, values):
+        unknown = (sensors < 0) | (sensors >= self.n_sensors)
+        if unknown.any():
+            self.stats.malformed += int(unknown.sum())
+            keep = ~unknown
+            timestamps, sensors, values = timestamps[keep], sensors[keep], values[keep]
+        windows = np.floor(timestamps / self.window_seconds).astype(np.int64)
+        if self.current is None and len(windows):
+            self.current = int(windows[0])
+        late = windows < self.current
+        if late.any():
+            self.stats.late += int(late.sum())
+            keep = ~late
+            windows, sensors, values = windows[keep], sensors[keep], values[keep]
+        for window in np.unique(windows):
+            if window > self.current:
+                self.flush()
+                self.current = int(window)
+            sel = windows == window
+            self._sums += np.bincount(sensors[sel], values[sel], minlength=self.n_sensors)
+            self._counts += np.bincount(sensors[sel], minlength=self.n_sensors)
+        self.stats.processed += len(values)
+        if len(timestamps):
+            self.stats.last_event_time = float(timestamps.max())
+
+    def flush(self):
+        """Close the current window: score the previous forecast, then update."""
+        if self.current is None or not self._counts.any():
+            return
+        with np.errstate(invalid='ignore', divide='ignore'):
+            observed = self._sums / self._counts  # NaN for silent sensors
+        # Only sensors that already had a forecast are scored; a sensor's first
+        # window seeds its level
+        scored = ~np.isnan(observed) & self.forecaster.initialized
+        if scored.any():
+            self.metrics.update(observed[scored], self.forecaster.predict()[scored])
+        self.forecaster.update(observed)
+        self.stats.windows += 1
+        self._sums[:] = 0
+        self._counts[:] = 0
+
+
+async def consume(queue, batcher, clock=time.time):
+    """Drain the queue into the batcher until a None sentinel arrives."""
+    while True:
+        block = await queue.get()
+        if block is None:
+            batcher.flush()
+            return
+        batcher.add(*block)
+        batcher.stats.last_lag = clock() - batcher.stats.last_event_time
+
+
+def synthetic_blocks(n_sensors, n_readings, block_size=10_000, start_time=None,
+                     interval=60.0, seed=42):
+    """Stand-in producer: every sensor reports once per interval, in time order."""
+    rng = np.random.default_rng(seed)
+    start_time = time.time() if start_time is None else start_time
+    base = rng.normal(20, 3, n_sensors)
+    for first in range(0, n_readings, block_size):
+        index = np.arange(first, min(first + block_size, n_readings))
+        sensors = index % n_sensors
+        step = index // n_sensors
+        timestamps = start_time + step * interval
+        values = (base[sensors] + 2 * np.sin(2 * np.pi * step / (7 * 1440))
+                  + rng.normal(0, 0.5, len(index)))
+        yield timestamps, sensors, values
+
+
+async def send_lines(host, port, blocks):
+    """Stand-in socket producer: write the blocks as text lines."""
+    _, writer = await asyncio.open_connection(host, port)
+    for timestamps, sensors, values in blocks:
+        lines = '\n'.join(f"{t:.3f},{s},{v:.4f}" for t, s, v in
+                          zip(timestamps.tolist(), sensors.tolist(), values.tolist()))
+        writer.write(lines.encode() + b'\n')
+        await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_pipeline(source, n_sensors, window_seconds=60.0, queue_size=64,
+                       report_every=2.0, **source_args):
+    """Run source -> queue -> batcher until the source ends; returns the batcher."""
+    stats = IngestionStats()
+    queue = asyncio.Queue(maxsize=queue_size)
+    batcher = WindowBatcher(n_sensors, window_seconds, stats=stats)
+    consumer = asyncio.create_task(consume(queue, batcher))
+
+    async def report():
+        while True:
+            await asyncio.sleep(report_every)
+            snap = stats.snapshot(queue)
+            print(f"  {snap['processed']:>12,} readings  {snap['readings_per_sec']:>12,.0f}/s  "
+                  f"queue {snap['queue_depth']:>3}/{queue_size}  windows {snap['windows']}")
+
+    async def produce():
+        if source == 'generator':
+            await generator_source(source_args['blocks'], queue, stats)
+        elif source == 'socket':
+            ready = asyncio.get_running_loop().create_future()
+            server = asyncio.create_task(socket_source('127.0.0.1', 0, queue, stats, ready))
+            port = await ready
+            await send_lines('127.0.0.1', port, source_args['blocks'])
+            await server
+        elif source == 'file':
+            await tail_source(source_args['path'], queue, stats, stop=source_args.get('stop'))
+        else:
+            raise ValueError(f"unknown source {source!r}")
+        await queue.put(None)
+
+    # Wait on both ends: if the consumer dies, the producer would otherwise
+    # block forever on the full queue
+    producer = asyncio.create_task(produce())
+    reporter = asyncio.create_task(report())
+    tasks = [producer, consumer]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks + [reporter]:
+            task.cancel()
+        await asyncio.gather(*tasks, reporter, return_exceptions=True)
+    return batcher
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the streaming ingestion pipeline")
+    parser.add_argument('--source', choices=['generator', 'socket', 'file'], default='generator')
+    parser.add_argument('--path', default=None, help="file to tail with --source file")
+    parser.add_argument('--sensors', type=int, default=1000)
+    parser.add_argument('--readings', type=float, default=1e6)
+    parser.add_argument('--window', type=float, default=60.0, help="window length in seconds")
+    parser.add_argument('--queue-size', type=int, default=64)
+    args = parser.parse_args()
+
+    blocks = synthetic_blocks(args.sensors, int(args.readings), start_time=0.0)
+    source_args = {'blocks': blocks}
+    if args.source == 'file':
+        if not args.path or not os.path.exists(args.path):
+            parser.error("--source file needs an existing --path")
+        source_args = {'path': args.path}
+
+    t0 = time.perf_counter()
+    batcher = asyncio.run(run_pipeline(args.source, args.sensors, args.window,
+                                       args.queue_size, **source_args))
+    elapsed = time.perf_counter() - t0
+    snap = batcher.stats.snapshot()
+    print(f"\nIngested {snap['processed']:,} readings in {elapsed:.2f}s "
+          f"({snap['processed'] / elapsed:,.0f} readings/sec)")
+    print(f"Windows: {snap['windows']}, late dropped: {snap['late_dropped']}, "
+          f"producer waits: {snap['producer_waits']}, max queue depth: {snap['max_queue_depth']}")
+    print(f"Forecast MAE: {batcher.metrics.mae:.3f}°C over {batcher.metrics.count:,} sensor-windows")
@@ -0,0 +1,140 @@
+"""
+Streaming Regression Metrics
+----------------------------
+Constant-memory running metrics for prediction streams: MAE, MSE/RMSE, R²,
+bias (mean signed error) and approximate quantiles of the absolute error.
+
+Moments are kept with Welford/Chan updates, so a state can take single
+observations or whole arrays, and states from separate partitions merge
+exactly. Quantiles come from a fixed log-bucketed histogram (in the style
+of DDSketch) with a bounded relative error, so the memory use does not
+depend on the stream length and histograms merge by adding counts.
+"""
+import math
+
+import numpy as np
+
+
+class ErrorQuantiles:
+    """Fixed-size log histogram of non-negative values with relative accuracy."""
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9, max_value=1e12):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.offset = math.floor(math.log(min_value) / self.log_gamma)
+        n_buckets = math.ceil(math.log(max_value) / self.log_gamma) - self.offset + 1
+        self.counts = np.zeros(n_buckets, dtype=np.int64)
+        self.zeros = 0
+
+    def update(self, values):
+        values = np.abs(np.atleast_1d(np.asarray(values, dtype=np.float64)))
+        small = values < self.min_value
+        self.zeros += int(small.sum())
+        keys = np.ceil(np.log(values[~small]) / self.log_gamma).astype(np.int64) - self.offset
+        np.clip(keys, 0, len(self.counts) - 1, out=keys)
+        self.counts += np.bincount(keys, minlength=len(self.counts))
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.zeros += other.zeros
+        return self
+
+    def quantile(self, q):
+        total = self.zeros + int(self.counts.sum())
+        if total == 0:
+            return float('nan')
+        rank = q * (total - 1)
+        if rank < self.zeros:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), rank - self.zeros, side='right'))
+        # Midpoint of the bucket (gamma^(k-1), gamma^k] in relative terms
+        return 2 * self.gamma ** (index + self.offset) / (self.gamma + 1)
+
+
+class StreamingMetrics:
+    """Running MAE, MSE/RMSE, R², bias and error quantiles in O(1) memory."""
+
+    def __init__(self, relative_accuracy=0.01):
+        self.count = 0
+        self.abs_error_mean = 0.0
+        self.error_mean = 0.0
+        self.error_m2 = 0.0
+        self.y_mean = 0.0
+        self.y_m2 = 0.0
+        self.quantiles = ErrorQuantiles(relative_accuracy)
+
+    def update(self, y_true, y_pred):
+        """Add one observation or a batch of observations."""
+        y_true = np.atleast_1d(np.asarray(y_true, dtype=np.float64))
+        errors = np.atleast_1d(np.asarray(y_pred, dtype=np.float64)) - y_true
+        n = len(errors)
+        if n == 0:
+            return self
+        batch = StreamingMetrics.__new__(StreamingMetrics)
+        batch.count = n
+        batch.abs_error_mean = float(np.abs(errors).mean())
+        batch.error_mean = float(errors.mean())
+        batch.error_m2 = float(((errors - batch.error_mean) ** 2).sum())
+        batch.y_mean = float(y_true.mean())
+        batch.y_m2 = float(((y_true - batch.y_mean) ** 2).sum())
+        batch.quantiles = None
+        self._merge_moments(batch)
+        self.quantiles.update(errors)
+        return self
+
+    def merge(self, other):
+        """Combine with the metrics of another partition."""
+        self._merge_moments(other)
+        self.quantiles.merge(other.quantiles)
+        return self
+
+    def _merge_moments(self, other):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        w = other.count / total
+        d_err = other.error_mean - self.error_mean
+        d_y = other.y_mean - self.y_mean
+        self.error_m2 += other.error_m2 + d_err ** 2 * self.count * w
+        self.y_m2 += other.y_m2 + d_y ** 2 * self.count * w
+        self.error_mean += d_err * w
+        self.y_mean += d_y * w
+        self.abs_error_mean += (other.abs_error_mean - self.abs_error_mean) * w
+        self.count = total
+
+    @property
+    def mae(self):
+        return self.abs_error_mean if self.count else float('nan')
+
+    @property
+    def bias(self):
+        return self.error_mean if self.count else float('nan')
+
+    @property
+    def mse(self):
+        if not self.count:
+            return float('nan')
+        return self.error_m2 / self.count + self.error_mean ** 2
+
+    @property
+    def rmse(self):
+        return math.sqrt(self.mse)
+
+    @property
+    def r2(self):
+        if not self.count or self.y_m2 == 0:
+            return float('nan')
+        return 1.0 - self.mse * self.count / self.y_m2
+
+    def quantile(self, q):
+        """Approximate quantile of the absolute error."""
+        return self.quantiles.quantile(q)
+
+    def summary(self):
+        return {
+            'count': self.count, 'mae': self.mae, 'mse': self.mse, 'rmse': self.rmse,
+            'r2': self.r2, 'bias': self.bias, 'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95), 'p99': self.quantile(0.99),
+        }
@@ -0,0 +1,176 @@
+"""
+Streaming Ordinary Least Squares
+--------------------------------
+Out-of-core training for the house price model. The CSV is read in
+fixed-size chunks and reduced to sufficient statistics (row count, column
+means and the centered co-moment matrix of [X, y]), so memory stays
+constant no matter how many rows the file has. The coefficients solved from
+these statistics are the same ones LinearRegression finds on the full data.
+"""
+import numpy as np
+import pandas as pd
+
+from columnar_store import is_columnar, iter_columnar_chunks
+
+FEATURE_COLUMNS = ['size_sqft', 'bedrooms', 'age_years']
+TARGET_COLUMN = 'price'
+
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+
+
+class SufficientStats:
+    """Mergeable row count, column means and centered co-moment matrix."""
+
+    def __init__(self, n_columns):
+        self.count = 0
+        self.mean = np.zeros(n_columns)
+        self.comoment = np.zeros((n_columns, n_columns))
+
+    @classmethod
+    def from_array(cls, block, weights=None):
+        """Compute the statistics of a 2-D block of rows, optionally weighted."""
+        block = np.asarray(block, dtype=np.float64)
+        stats = cls(block.shape[1])
+        if len(block):
+            if weights is None:
+                stats.count = len(block)
+                stats.mean = block.mean(axis=0)
+                centered = block - stats.mean
+                stats.comoment = centered.T @ centered
+            else:
+                stats.count = float(weights.sum())
+                stats.mean = weights @ block / stats.count
+                centered = block - stats.mean
+                stats.comoment = (centered * weights[:, None]).T @ centered
+        return stats
+
+    def copy(self):
+        stats = SufficientStats(len(self.mean))
+        stats.count = self.count
+        stats.mean = self.mean.copy()
+        stats.comoment = self.comoment.copy()
+        return stats
+
+    def scale(self, factor):
+        """Down-weight every row seen so far (forgetting factor)."""
+        self.count *= factor
+        self.comoment = self.comoment * factor
+        return self
+
+    def update(self, block):
+        """Fold a new block of rows into the statistics."""
+        return self.merge(SufficientStats.from_array(block))
+
+    def merge(self, other):
+        """Combine with the statistics of another partition (Chan et al.)."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count = other.count
+            self.mean = other.mean.copy()
+            self.comoment = other.comoment.copy()
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.comoment = (self.comoment + other.comoment
+                         + np.outer(delta, delta) * (self.count * other.count / total))
+        self.mean = self.mean + delta * (other.count / total)
+        self.count = total
+        return self
+
+    def subtract(self, other):
+        """Remove a partition merged in earlier, e.g. a held-out fold (inverse of merge)."""
+        if other.count == 0:
+            return self
+        rest = self.count - other.count
+        if rest <= 0:
+            raise ValueError("cannot subtract all rows from the statistics")
+        rest_mean = (self.count * self.mean - other.count * other.mean) / rest
+        delta = other.mean - rest_mean
+        self.comoment = (self.comoment - other.comoment
+                         - np.outer(delta, delta) * (rest * other.count / self.count))
+        self.mean = rest_mean
+        self.count = rest
+        return self
+
+
+def row_uniforms(row_index, seed=42):
+    """Map global row numbers to reproducible uniforms in [0, 1) (splitmix64)."""
+    with np.errstate(over='ignore'):
+        # uint64 arithmetic is meant to wrap around here
+        z = np.asarray(row_index, dtype=np.uint64) + np.uint64(seed) * _GOLDEN_GAMMA
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+def holdout_mask(start, n_rows, test_size=0.2, seed=42):
+    """Rows [start, start + n_rows) that belong to the held-out split.
+
+    The assignment only depends on the global row number, so it does not
+    change with the chunk size or the order in which chunks are read.
+    """
+    return row_uniforms(np.arange(start, start + n_rows), seed) < test_size
+
+
+def iter_csv_chunks(path, columns, chunksize=100_000):
+    """Yield (start_row, float64 array) pairs from a CSV file."""
+    start = 0
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+        block = chunk[columns].to_numpy(dtype=np.float64)
+        yield start, block
+        start += len(block)
+
+
+def iter_chunks(path, columns, chunksize=100_000):
+    """Chunks from a CSV file or a columnar directory (see columnar_store)."""
+    if is_columnar(path):
+        return iter_columnar_chunks(path, columns, chunksize)
+    return iter_csv_chunks(path, columns, chunksize)
+
+
+def accumulate(chunks, test_size=0.2, seed=42):
+    """Reduce (start_row, block) chunks to train and held-out statistics."""
+    train = test = None
+    for start, block in chunks:
+        if train is None:
+            train = SufficientStats(block.shape[1])
+            test = SufficientStats(block.shape[1])
+        mask = holdout_mask(start, len(block), test_size, seed)
+        train.update(block[~mask])
+        test.update(block[mask])
+    return train, test
+
+
+def solve_ols(stats):
+    """Solve for coefficients and intercept; the last column is the target."""
+    cxx = stats.comoment[:-1, :-1]
+    cxy = stats.comoment[:-1, -1]
+    coef = np.linalg.lstsq(cxx, cxy, rcond=None)[0]
+    intercept = stats.mean[-1] - stats.mean[:-1] @ coef
+    return coef, intercept
+
+
+def evaluate(stats, coef, intercept):
+    """MSE and R² of a fitted model on the rows summarised by ``stats``."""
+    if stats.count == 0:
+        return float('nan'), float('nan')
+    weights = np.append(-coef, 1.0)
+    mean_residual = stats.mean @ weights - intercept
+    sse = weights @ stats.comoment @ weights + stats.count * mean_residual ** 2
+    mse = sse / stats.count
+    r2 = 1.0 - sse / stats.comoment[-1, -1]
+    return float(mse), float(r2)
+
+
+def to_linear_regression(coef, intercept, feature_names):
+    """Wrap a solution in a fitted LinearRegression so it saves and predicts as usual."""
+    from sklearn.linear_model import LinearRegression
+
+    model = LinearRegression()
+    model.coef_ = np.asarray(coef, dtype=np.float64)
+    model.intercept_ = float(intercept)
+    model.n_features_in_ = len(feature_names)
+    model.feature_names_in_ = np.asarray(feature_names, dtype=object)
+    return model
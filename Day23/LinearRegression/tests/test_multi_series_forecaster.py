@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from multi_series_forecaster import VectorizedForecaster, scalar_ema
+
+
+@pytest.mark.parametrize('method', ['ema', 'holt_winters'])
+def test_series_that_starts_missing_is_seeded_from_its_first_reading(method):
+    forecaster = VectorizedForecaster(2, method=method)
+    forecaster.update([np.nan, 20.0])
+    assert forecaster.initialized.tolist() == [False, True]
+    forecaster.update([20.0, 20.0])
+    np.testing.assert_allclose(forecaster.level, [20.0, 20.0])
+    np.testing.assert_allclose(forecaster.trend, [0.0, 0.0])
+    assert forecaster.initialized.all()
+
+
+def test_missing_reading_leaves_state_untouched():
+    forecaster = VectorizedForecaster(2)
+    forecaster.update([10.0, 20.0])
+    forecaster.update([np.nan, 30.0])
+    np.testing.assert_allclose(forecaster.level, [10.0, 0.3 * 30.0 + 0.7 * 20.0])
+
+
+def test_run_matches_scalar_loop_with_late_start():
+    data = np.array([[np.nan, 20.0], [21.0, 22.0], [19.0, 21.0], [23.0, 20.0]])
+    forecasts = VectorizedForecaster(2).run(data)
+    np.testing.assert_allclose(forecasts[1:, 0], scalar_ema(data[1:, 0]))
+    np.testing.assert_allclose(forecasts[:, 1], scalar_ema(data[:, 1]))
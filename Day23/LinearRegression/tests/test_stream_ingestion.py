@@ -0,0 +1,43 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from stream_ingestion import WindowBatcher, parse_lines, run_pipeline
+
+
+def test_sensor_first_reporting_in_a_later_window_starts_from_its_reading():
+    batcher = WindowBatcher(2, window_seconds=60.0)
+    batcher.add(np.array([0.0]), np.array([0]), np.array([20.0]))
+    batcher.add(np.array([60.0, 61.0]), np.array([0, 1]), np.array([20.0, 30.0]))
+    batcher.add(np.array([120.0, 121.0]), np.array([0, 1]), np.array([20.0, 30.0]))
+    batcher.flush()
+    np.testing.assert_allclose(batcher.forecaster.predict(), [20.0, 30.0])
+    # Sensor 1 is scored once (window 2), never against the empty starting level
+    assert batcher.metrics.count == 3
+    assert batcher.metrics.mae == 0.0
+
+
+def test_unknown_sensor_ids_are_counted_as_malformed():
+    batcher = WindowBatcher(2)
+    batcher.add(np.array([0.0, 1.0, 2.0]), np.array([0, 5, -1]), np.array([1.0, 2.0, 3.0]))
+    assert batcher.stats.malformed == 2
+    assert batcher.stats.processed == 1
+
+
+def test_short_line_does_not_shift_later_fields():
+    timestamps, sensors, values = parse_lines(b'1,2\n4,5,6.0\n7,1,2\n')
+    assert timestamps.tolist() == [4.0, 7.0]
+    assert sensors.tolist() == [5, 1]
+    assert values.tolist() == [6.0, 2.0]
+
+
+def test_consumer_failure_is_raised_instead_of_hanging(monkeypatch):
+    def fail(self, *block):
+        raise RuntimeError("consumer died")
+
+    monkeypatch.setattr(WindowBatcher, 'add', fail)
+    blocks = [(np.arange(10.0), np.zeros(10, dtype=np.int64), np.ones(10))] * 100
+    pipeline = run_pipeline('generator', 1, queue_size=2, blocks=blocks)
+    with pytest.raises(RuntimeError, match="consumer died"):
+        asyncio.run(asyncio.wait_for(pipeline, 5))
@@ -0,0 +1,345 @@
+"""
+Benchmark cases: the hot path of every script at a given size.
+
+Each case receives ``size`` (rows, readings or elements) and a scratch
+directory, does its setup there (untimed) and returns a zero-argument
+callable that runs the hot path once. That callable returns the number of
+rows it processed, which the runner turns into throughput.
+
+Engine cases that only need a stream of chunks reuse one pre-built chunk,
+so the timing is the aggregation itself and the input never has to fit in
+memory. The pandas/DataFrame cases materialise everything on purpose:
+finding the size where they stop scaling is the point.
+"""
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DAY1 = os.path.join(ROOT, 'Day1', 'descriptive_statistics', 'scripts')
+DAY19 = os.path.join(ROOT, 'Day19', 'probability_distribution', 'normal_distribution', 'scripts')
+DAY20 = os.path.join(ROOT, 'Day20', 'Central_Limit_Theorem', 'scripts')
+DAY23 = os.path.join(ROOT, 'Day23', 'LinearRegression', 'scripts')
+
+CHUNK = 1_000_000
+
+CASES = {}
+
+
+class Case:
+    def __init__(self, name, script_dir, setup, max_size, description):
+        self.name = name
+        self.script_dir = script_dir
+        self.setup = setup
+        self.max_size = max_size
+        self.description = description
+
+
+def case(name, script_dir, max_size=10**8):
+    """Register a setup function as a benchmark case."""
+    def register(setup):
+        CASES[name] = Case(name, script_dir, setup, max_size,
+                           (setup.__doc__ or '').strip().splitlines()[0])
+        return setup
+    return register
+
+
+def _quiet(fn, *args, **kwargs):
+    """Call a script function with its progress prints swallowed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def _house_csv(size, workdir):
+    from data_generator import write_dataset
+
+    path = os.path.join(workdir, 'data', 'house_prices.csv')
+    write_dataset(path, size, workers=1)
+    return path
+
+
+def _chunks(size, chunk):
+    """(start, stop) pairs covering ``size`` rows with pieces of ``chunk``."""
+    for start in range(0, size, len(chunk)):
+        yield start, min(start + len(chunk), size)
+
+
+# -- Day23: house prices ----------------------------------------------------
+
+@case('generate_sample_data', DAY23)
+def generate_sample_data(size, workdir):
+    """batch_ml_example.generate_sample_data: synthesize and write the CSV."""
+    from batch_ml_example import generate_sample_data as generate
+
+    def run():
+        _quiet(generate, size)
+        return size
+    return run
+
+
+@case('train_batch_model', DAY23)
+def train_batch_model(size, workdir):
+    """batch_ml_example.train_batch_model: load, split, fit, evaluate, save."""
+    from batch_ml_example import train_batch_model as train
+
+    # The script imports these lazily; keep the import time out of the timing
+    import joblib  # noqa: F401
+    import sklearn.linear_model  # noqa: F401
+    import sklearn.model_selection  # noqa: F401
+
+    path = _house_csv(size, workdir)
+
+    def run():
+        _quiet(train, path)
+        return size
+    return run
+
+
+@case('make_predictions', DAY23)
+def make_predictions(size, workdir):
+    """make_predictions at scale: score_listings over a CSV of listings."""
+    import joblib
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    from batch_ml_example import score_listings
+    from streaming_ols import FEATURE_COLUMNS, TARGET_COLUMN
+
+    path = _house_csv(size, workdir)
+    sample = pd.read_csv(path, nrows=10_000)
+    model = LinearRegression().fit(sample[FEATURE_COLUMNS], sample[TARGET_COLUMN])
+    model_path = os.path.join(workdir, 'models', 'bench_model.joblib')
+    joblib.dump(model, model_path)
+
+    def run():
+        _quiet(score_listings, model_path, path)
+        return size
+    return run
+
+
+@case('fast_score', DAY23)
+def fast_score(size, workdir):
+    """fast_score.score_csv: NumPy-only scoring with an exported model."""
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
+    from fast_score import score_csv
+    from model_export import export_model
+    from streaming_ols import FEATURE_COLUMNS, TARGET_COLUMN
+
+    path = _house_csv(size, workdir)
+    sample = pd.read_csv(path, nrows=10_000)
+    model = LinearRegression().fit(sample[FEATURE_COLUMNS], sample[TARGET_COLUMN])
+    export_path = export_model(model, path=os.path.join(workdir, 'models', 'bench_model.linear.json'))
+
+    def run():
+        score_csv(export_path, path, os.path.join(workdir, 'predictions', 'scores.csv'))
+        return size
+    return run
+
+
+@case('permutation_importance', DAY23)
+def permutation_importance(size, workdir):
+    """permutation_importance: 3 features x 10 repeats with confidence intervals."""
+    from sklearn.linear_model import LinearRegression
+
+    from permutation_importance import permutation_importance as importance
+
+    rng = np.random.default_rng(42)
+    X = np.column_stack([rng.normal(1500, 500, size), rng.integers(1, 6, size),
+                         rng.integers(0, 50, size)])
+    y = X @ [200, 30000, -1000] + rng.normal(0, 10000, size)
+    model = LinearRegression().fit(X[:10_000], y[:10_000])
+
+    def run():
+        importance(model, X, y, n_repeats=10)
+        return size
+    return run
+
+
+# -- Day23: online temperature prediction ------------------------------------
+
+@case('online_ema_loop', DAY23, max_size=10**7)
+def online_ema_loop(size, workdir):
+    """The per-reading Python EMA loop of online_temperature_prediction."""
+    from multi_series_forecaster import scalar_ema
+
+    temperatures = 20 + np.random.default_rng(42).normal(0, 0.5, size)
+
+    def run():
+        scalar_ema(temperatures)
+        return size
+    return run
+
+
+@case('online_ema_vectorized', DAY23)
+def online_ema_vectorized(size, workdir):
+    """VectorizedForecaster EMA over 1,000 sensors (size = total readings)."""
+    from multi_series_forecaster import VectorizedForecaster, generate_sensor_data
+
+    n_sensors = min(1000, size)
+    steps = max(1, size // n_sensors)
+    block = generate_sensor_data(n_sensors, min(steps, 1000))
+
+    def run():
+        forecaster = VectorizedForecaster(n_sensors)
+        for step in range(steps):
+            forecaster.update(block[step % len(block)])
+        return steps * n_sensors
+    return run
+
+
+# -- Day19: normal distribution ----------------------------------------------
+
+@case('zscore_report', DAY19)
+def zscore_report(size, workdir):
+    """zscore_report.write_report: two streaming passes over a scores CSV."""
+    import pandas as pd
+
+    from zscore_report import write_report
+
+    path = os.path.join(workdir, 'scores.csv')
+    rng = np.random.default_rng(42)
+    header = True
+    for start, stop in _chunks(size, range(CHUNK)):
+        scores = np.clip(rng.normal(65, 15, stop - start), 0, 100).round()
+        pd.DataFrame({'Name': np.arange(start, stop), 'Score': scores}).to_csv(
+            path, mode='w' if header else 'a', header=header, index=False)
+        header = False
+
+    def run():
+        write_report(path, os.path.join(workdir, 'report.csv'))
+        return size
+    return run
+
+
+@case('normal_pdf', DAY19)
+def normal_pdf(size, workdir):
+    """pdf.normal_pdf (the script's own formula) on an array of heights."""
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    pdf = _quiet(__import__, 'pdf')
+    x = np.linspace(130, 210, size)
+
+    def run():
+        pdf.normal_pdf(x, 170, 10)
+        return size
+    return run
+
+
+@case('normal_kernels_pdf', DAY19)
+def normal_kernels_pdf(size, workdir):
+    """normal_kernels.pdf writing into a preallocated buffer."""
+    from normal_kernels import pdf
+
+    x = np.linspace(130, 210, size)
+    out = np.empty(size)
+
+    def run():
+        pdf(x, 170, 10, out=out)
+        return size
+    return run
+
+
+# -- Day20: central limit theorem -------------------------------------------
+
+@case('clt_simulation', DAY20)
+def clt_simulation(size, workdir):
+    """clt_simulation.simulate_task: lognormal sample means, n=100 (size = draws)."""
+    from clt_simulation import LogNormal, simulate_task
+
+    source = LogNormal()
+    reps = max(1, size // 100)
+
+    def run():
+        simulate_task(source, 100, reps, (0,))
+        return reps * 100
+    return run
+
+
+# -- Day1: descriptive statistics --------------------------------------------
+
+def _study_chunk(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    methods = rng.integers(0, 3, rows).astype(np.int8)
+    results = (rng.random(rows) < np.array([0.4, 0.75, 0.9])[methods]).astype(np.int8)
+    scores = np.clip(rng.normal(70 + 8 * methods, 8), 0, 100)
+    return methods, results, scores
+
+
+@case('crosstab_groupby_codes', DAY1)
+def crosstab_groupby_codes(size, workdir):
+    """category_aggregation: crosstab, group means and medians over int codes."""
+    from category_aggregation import ContingencyTable, GroupHistogram, GroupStats
+
+    methods, results, scores = _study_chunk(min(size, CHUNK))
+
+    def run():
+        table, stats, histogram = ContingencyTable(), GroupStats(), GroupHistogram(0, 100)
+        for start, stop in _chunks(size, methods):
+            n = stop - start
+            table.update(methods[:n], results[:n])
+            stats.update(methods[:n], scores[:n])
+            histogram.update(methods[:n], scores[:n])
+        histogram.quantile(0.5)
+        return size
+    return run
+
+
+@case('crosstab_groupby_pandas', DAY1)
+def crosstab_groupby_pandas(size, workdir):
+    """pd.crosstab + groupby mean/median on object-dtype string columns."""
+    import pandas as pd
+
+    methods, results, scores = _study_chunk(size)
+    df = pd.DataFrame({
+        'Study_Method': np.array(['Self-Study', 'Group', 'Tutoring'], dtype=object)[methods],
+        'Result': np.array(['Fail', 'Pass'], dtype=object)[results],
+        'Score': scores,
+    })
+    del methods, results, scores
+
+    def run():
+        pd.crosstab(df['Study_Method'], df['Result'])
+        df.groupby('Study_Method')['Score'].agg(['mean', 'median'])
+        return size
+    return run
+
+
+@case('corr_matrix_streaming', DAY1)
+def corr_matrix_streaming(size, workdir):
+    """correlation_matrix.CoMoments over 10 columns in 1M-row chunks."""
+    from correlation_matrix import CoMoments
+
+    block = np.random.default_rng(42).normal(size=(min(size, CHUNK), 10))
+
+    def run():
+        moments = CoMoments([f'x{i}' for i in range(10)])
+        for start, stop in _chunks(size, block):
+            moments.update(block[:stop - start])
+        moments.correlation()
+        return size
+    return run
+
+
+@case('corr_pandas', DAY1)
+def corr_pandas(size, workdir):
+    """DataFrame.corr on 10 columns held in memory."""
+    import pandas as pd
+
+    df = pd.DataFrame(np.random.default_rng(42).normal(size=(size, 10)))
+
+    def run():
+        df.corr()
+        return size
+    return run
+
+
+def load(name):
+    """Look up a case and put its script directory on the import path."""
+    selected = CASES[name]
+    if selected.script_dir not in sys.path:
+        sys.path.insert(0, selected.script_dir)
+    return selected
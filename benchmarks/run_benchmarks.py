@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Scaling Benchmark Suite
+-----------------------
+Runs every hot path in benchmarks/cases.py at sizes from 10^3 up to 10^8
+and records wall time, throughput and peak memory. Each (case, size) runs
+in a fresh subprocess inside a scratch directory, so one run's memory does
+not leak into the next and a crash or timeout only ends that case. The
+first size that times out or fails is reported as where the path stops
+scaling, and larger sizes of that case are skipped.
+
+Results are written as JSON to benchmarks/results/ and can be compared
+against a saved baseline; stages more than --threshold times slower fail
+the run (exit code 1).
+
+    python benchmarks/run_benchmarks.py                        # 10^3..10^6
+    python benchmarks/run_benchmarks.py --max-size 1e8 --timeout 900
+    python benchmarks/run_benchmarks.py --cases zscore_report normal_pdf
+    python benchmarks/run_benchmarks.py --save-baseline        # new baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import cases  # noqa: E402
+
+RESULTS_DIR = os.path.join(HERE, 'results')
+BASELINE_PATH = os.path.join(HERE, 'baseline.json')
+
+
+# -- child process -----------------------------------------------------------
+
+def _reset_peak_rss():
+    """Reset the kernel's high-water mark so the peak covers only the timed run."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        return None
+
+
+def _peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def run_child(name, size, repeat):
+    """Set up and time one case in this process; prints one JSON line."""
+    selected = cases.load(name)
+    run = selected.setup(size, os.getcwd())
+    before = _current_rss_mb()
+    isolated = _reset_peak_rss()
+    best = math.inf
+    rows = size
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = run()
+        best = min(best, time.perf_counter() - t0)
+    print(json.dumps({'seconds': best, 'rows': rows, 'peak_rss_mb': _peak_rss_mb(),
+                      'rss_before_mb': before, 'peak_includes_setup': not isolated}))
+
+
+# -- parent ------------------------------------------------------------------
+
+def run_case(name, size, timeout, repeat):
+    """Run one (case, size) in a subprocess; returns a result record."""
+    record = {'case': name, 'size': size}
+    env = dict(os.environ, MPLBACKEND='Agg')
+    with tempfile.TemporaryDirectory(prefix='bench_') as workdir:
+        for sub in ('data', 'models', 'predictions'):
+            os.makedirs(os.path.join(workdir, sub))
+        t0 = time.perf_counter()
+        try:
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', name, str(size),
+                 '--repeat', str(repeat)],
+                cwd=workdir, env=env, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            record.update(status='timeout', wall_with_setup=time.perf_counter() - t0)
+            return record
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        error = proc.stderr.strip().splitlines()
+        if proc.returncode < 0:
+            status = f'killed (signal {-proc.returncode})'
+        elif error and 'MemoryError' in error[-1]:
+            status = 'memory'
+        else:
+            status = 'error'
+        record.update(status=status, error=error[-1] if error else '')
+        return record
+    result = json.loads(lines[-1])
+    record.update(status='ok', seconds=result['seconds'],
+                  rows_per_sec=result['rows'] / result['seconds'] if result['seconds'] > 0 else None,
+                  peak_rss_mb=result['peak_rss_mb'], rss_before_mb=result['rss_before_mb'],
+                  peak_includes_setup=result['peak_includes_setup'])
+    return record
+
+
+def scaling_exponents(records):
+    """log(time ratio) / log(size ratio) between consecutive sizes: ~1 means linear."""
+    previous = {}
+    for record in records:
+        if record['status'] != 'ok':
+            continue
+        last = previous.get(record['case'])
+        if last and last['seconds'] > 0 and record['seconds'] > 0:
+            record['scaling'] = (math.log(record['seconds'] / last['seconds'])
+                                 / math.log(record['size'] / last['size']))
+        previous[record['case']] = record
+    return records
+
+
+def format_table(records):
+    lines = [f"{'Case':<26} {'Size':>12} {'Seconds':>10} {'Rows/s':>14} {'Peak MB':>9} "
+             f"{'Scaling':>8}  Status",
+             "-" * 96]
+    for r in records:
+        if r['status'] == 'ok':
+            scaling = f"{r['scaling']:8.2f}" if 'scaling' in r else f"{'':>8}"
+            lines.append(f"{r['case']:<26} {r['size']:>12,} {r['seconds']:10.4f} "
+                         f"{r['rows_per_sec'] or 0:14,.0f} {r['peak_rss_mb']:9.1f} {scaling}  ok")
+        else:
+            lines.append(f"{r['case']:<26} {r['size']:>12,} {'':>10} {'':>14} {'':>9} "
+                         f"{'':>8}  {r['status']} <- stops scaling")
+    return '\n'.join(lines)
+
+
+def compare(records, baseline, threshold=1.25, min_seconds=0.05):
+    """Time ratios against a baseline run; returns (table, regressions)."""
+    old = {(r['case'], r['size']): r for r in baseline['results'] if r['status'] == 'ok'}
+    lines = [f"{'Case':<26} {'Size':>12} {'Baseline s':>11} {'Now s':>10} {'Ratio':>7}",
+             "-" * 70]
+    regressions = []
+    for r in records:
+        before = old.get((r['case'], r['size']))
+        if before is None:
+            continue
+        if r['status'] != 'ok':
+            lines.append(f"{r['case']:<26} {r['size']:>12,} {before['seconds']:11.4f} "
+                         f"{r['status']:>10}  <- regression")
+            regressions.append((r['case'], r['size']))
+            continue
+        ratio = r['seconds'] / before['seconds'] if before['seconds'] > 0 else 1.0
+        flag = ''
+        if ratio > threshold and r['seconds'] >= min_seconds:
+            flag = '  <- slower'
+            regressions.append((r['case'], r['size']))
+        lines.append(f"{r['case']:<26} {r['size']:>12,} {before['seconds']:11.4f} "
+                     f"{r['seconds']:10.4f} {ratio:6.2f}x{flag}")
+    return '\n'.join(lines), regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling benchmarks for every script's hot path")
+    parser.add_argument('--cases', nargs='*', default=None, help="subset of cases (default: all)")
+    parser.add_argument('--sizes', nargs='*', type=float, default=None,
+                        help="sizes to run (default: 1e3 1e4 1e5 1e6, up to --max-size)")
+    parser.add_argument('--max-size', type=float, default=1e6,
+                        help="run powers of ten up to this size (at most 1e8)")
+    parser.add_argument('--timeout', type=float, default=600, help="seconds per (case, size)")
+    parser.add_argument('--repeat', type=int, default=1, help="timed runs per size, best kept")
+    parser.add_argument('--output', default=None, help="results JSON (default: results/<time>.json)")
+    parser.add_argument('--baseline', default=None, help="compare against this results JSON")
+    parser.add_argument('--threshold', type=float, default=1.25)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f"also write the results to {os.path.relpath(BASELINE_PATH)}")
+    parser.add_argument('--list', action='store_true', help="list the cases and exit")
+    parser.add_argument('--child', nargs=2, metavar=('CASE', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]), args.repeat)
+        return 0
+    if args.list:
+        for name, selected in cases.CASES.items():
+            print(f"{name:<26} {selected.description}")
+        return 0
+
+    names = args.cases or list(cases.CASES)
+    unknown = [n for n in names if n not in cases.CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    if args.sizes:
+        sizes = sorted(int(s) for s in args.sizes)
+    else:
+        top = int(round(math.log10(min(args.max_size, 1e8))))
+        sizes = [10**k for k in range(3, top + 1)]
+
+    records = []
+    for name in names:
+        for size in sizes:
+            if size > cases.CASES[name].max_size:
+                break
+            record = run_case(name, size, args.timeout, args.repeat)
+            records.append(record)
+            print(f"  {name:<26} {size:>12,}  {record['status']}"
+                  + (f"  {record['seconds']:.4f}s" if record['status'] == 'ok' else ''),
+                  flush=True)
+            if record['status'] != 'ok':
+                break
+    scaling_exponents(records)
+
+    report = {
+        'meta': {'date': datetime.now().isoformat(timespec='seconds'), 'commit': _git_commit(),
+                 'python': platform.python_version(), 'host': platform.node(),
+                 'cpus': os.cpu_count(), 'sizes': sizes, 'timeout': args.timeout},
+        'results': records,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    print()
+    print(format_table(records))
+    print(f"\nResults saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        table, regressions = compare(records, baseline, args.threshold)
+        print(f"\n=== Compared with {args.baseline} ===")
+        print(table)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.2f}x")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())